@@ -0,0 +1,166 @@
+"""
+Prepares precompiled runtime: trims unused distributions from venv, compiles venv and application
+into unchecked-hash .pyc files and measures cold start of migration commands before and after.
+
+Must be run by venv python: /.venv/bin/python docker/build_runtime.py --app-dir /
+"""
+import argparse
+import compileall
+import importlib.metadata
+import json
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import sysconfig
+import time
+from pathlib import Path
+from py_compile import PycInvalidationMode
+from typing import List, Set
+
+# installed by Pipfile but never imported by migration_tool
+TRIM_DISTRIBUTIONS = ['pandas', 'numpy', 'colorama', 'pip', 'setuptools', 'wheel']
+TRIM_DIRECTORIES = ['tests']
+# modules loaded by short-lived migrate and status jobs, cli imports runners, loaders and drivers lazily,
+# so they are listed explicitly as a migrate run resolving postgresql runner and github source loads them
+BENCHMARK_MODULES = [
+    'migration_tool.cli',
+    'migration_tool.commands.migrate',
+    'migration_tool.commands.status',
+    'migration_tool.db_migration.postgresql',
+    'migration_tool.migration_files.loader.git_hub',
+    'migration_tool.version_probe.postgresql',
+    'sqlalchemy.dialects.postgresql.psycopg2',
+    'pglast.parser',
+]
+BENCHMARK_SCRIPT = f"import {', '.join(BENCHMARK_MODULES)}"
+REQUIREMENT_NAME_REGEX = re.compile(r'^[A-Za-z0-9._-]+')
+
+
+def normalize(name: str) -> str:
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def required_by_kept(trimmed: Set[str]) -> Set[str]:
+    required = set()
+    for dist in importlib.metadata.distributions():
+        if normalize(dist.metadata['Name']) in trimmed:
+            continue
+        for requirement in dist.requires or []:
+            if 'extra ==' in requirement:
+                continue
+            match = REQUIREMENT_NAME_REGEX.match(requirement)
+            if match is not None:
+                required.add(normalize(match.group()))
+
+    return required
+
+
+def trim_venv(site_packages: Path):
+    trimmed = {normalize(name) for name in TRIM_DISTRIBUTIONS}
+    needed = required_by_kept(trimmed)
+
+    for name in TRIM_DISTRIBUTIONS:
+        if normalize(name) in needed:
+            print(f"Keeping {name}: required by other distributions")
+            continue
+        try:
+            dist = importlib.metadata.distribution(name)
+        except importlib.metadata.PackageNotFoundError:
+            continue
+
+        roots = set()
+        for file in dist.files or []:
+            path = Path(dist.locate_file(file)).resolve()
+            if site_packages not in path.parents:
+                continue
+            roots.add(site_packages / path.relative_to(site_packages).parts[0])
+
+        for root in roots:
+            if root.is_dir():
+                shutil.rmtree(root)
+            elif root.exists():
+                root.unlink()
+        print(f"Trimmed {name}: {len(roots)} top level entries")
+
+    for directory in TRIM_DIRECTORIES:
+        for path in list(site_packages.glob(f"*/**/{directory}")):
+            if path.is_dir():
+                shutil.rmtree(path)
+
+    for path in list(site_packages.rglob('__pycache__')):
+        shutil.rmtree(path)
+
+
+def compile_tree(path: Path):
+    is_ok = compileall.compile_dir(
+        str(path),
+        quiet=1,
+        optimize=0,
+        workers=0,
+        invalidation_mode=PycInvalidationMode.UNCHECKED_HASH,
+    )
+    if not is_ok:
+        raise RuntimeError(f"Can't compile {path}")
+
+
+def measure_startup(app_dir: Path, runs: int, env: dict) -> List[float]:
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', BENCHMARK_SCRIPT], cwd=app_dir, env=env, check=True)
+        durations.append(time.perf_counter() - start)
+
+    return durations
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Build precompiled migration tool runtime.')
+    parser.add_argument("--app-dir", type=Path, required=True, dest='app_dir')
+    parser.add_argument("--runs", type=int, default=10, dest='runs')
+    parser.add_argument(
+        "--max-startup",
+        type=float,
+        default=None,
+        dest='max_startup',
+        help='Fail build if median precompiled startup exceeds given seconds.',
+    )
+    parser.add_argument("--report", type=Path, default=None, dest='report')
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    app_dir = args.app_dir.resolve()
+    site_packages = Path(sysconfig.get_paths()['purelib']).resolve()
+    package_dir = app_dir / 'migration_tool'
+
+    trim_venv(site_packages)
+
+    source_env = {'PYTHONDONTWRITEBYTECODE': '1', 'PATH': str(Path(sys.executable).parent)}
+    source_runs = measure_startup(app_dir, args.runs, source_env)
+
+    compile_tree(site_packages)
+    compile_tree(package_dir)
+    compiled_runs = measure_startup(app_dir, args.runs, source_env)
+
+    report = {
+        'runs': args.runs,
+        'source_median': statistics.median(source_runs),
+        'precompiled_median': statistics.median(compiled_runs),
+        'precompiled_max': max(compiled_runs),
+    }
+    print(json.dumps(report))
+    if args.report is not None:
+        args.report.write_text(json.dumps(report))
+
+    if args.max_startup is not None and report['precompiled_median'] > args.max_startup:
+        raise RuntimeError(
+            f"Precompiled startup {report['precompiled_median']:.3f}s exceeds limit {args.max_startup}s"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,31 @@
 import logging
 import os
 import platform
+import sys
 import time
 
 import argparse
-from typing import Optional
-
-from migration_tool.config_parser.parser import MigrationsConfigParser
-from migration_tool.db_migration.base import DBMigrationRunner
-from migration_tool.db_migration.postgresql import PostgreSQLMigrationRunner
-from migration_tool.logger.mix_in import LoggerMixIn
-from migration_tool.logger.utils import init_logger
-from migration_tool.migration_config import MigrationConfig
-from migration_tool.migration_files.loader.git_hub import FromGitHubRepoMigrationFilesLoader, \
-    FromGitHubRepoMigrationFilesLoaderConfig
-from migration_tool.settings import settings
+from importlib import import_module
+from typing import List, Optional
 
-PROG = 'cli'
-init_logger()
-# getting only important messages from urllib3
-logging.getLogger("urllib3").setLevel(logging.WARNING)
+from migration_tool.db_types import DBType
 
-if not platform.system() == 'Windows':
-    os.environ['TZ'] = 'Europe/Moscow'
-    getattr(time, 'tzset')()
+PROG = 'cli'
+# command modules are imported only for the invoked command, each module provides main(args)
+COMMANDS = {
+    'migrate': 'migration_tool.commands.migrate',
+    'status': 'migration_tool.commands.status',
+    'daemon': 'migration_tool.commands.daemon',
+    'watch': 'migration_tool.commands.watch',
+    'bundle': 'migration_tool.commands.bundle',
+    'survey': 'migration_tool.commands.survey',
+    'validate': 'migration_tool.commands.validate',
+    'rehearse': 'migration_tool.commands.rehearse',
+    'drift': 'migration_tool.commands.drift',
+}
+DEFAULT_COMMAND = 'migrate'
+# commands printing json results to stdout, their logs go to stderr
+RESULT_COMMANDS = {'status'}
 
 
 def version_value(value: Optional[str]):
@@ -37,12 +39,7 @@ def version_value(value: Optional[str]):
     return value
 
 
-def parse_args():
-    # create parser object
-    parser = argparse.ArgumentParser(
-        prog=PROG,
-        description='Run migration for db.'
-    )
+def add_name_argument(parser: argparse.ArgumentParser):
     parser.add_argument(
         "--name",
         type=str,
@@ -52,6 +49,14 @@ def parse_args():
         Target id from config file. 
         ''',
     )
+
+
+def add_migrate_parser(subparsers):
+    parser = subparsers.add_parser(
+        'migrate',
+        description='Run migration for db.'
+    )
+    add_name_argument(parser)
     parser.add_argument(
         "--from",
         type=version_value,
@@ -93,59 +98,381 @@ def parse_args():
         Mock param for bypassing some limitations.
         '''
     )
-    return parser.parse_args()
 
 
-logger = LoggerMixIn.init_logger()
+def add_tag_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--tag",
+        type=str,
+        action='append',
+        default=[],
+        dest='tags',
+        help='''
+        Select targets by 'key=value' tag or group name from config file, can be repeated.
+        ''',
+    )
 
 
-def get_runner_for_db(name: str, parser: MigrationsConfigParser) -> DBMigrationRunner:
-    target = parser.targets.get(name, None)
+def add_status_parser(subparsers):
+    parser = subparsers.add_parser(
+        'status',
+        description='Print current db version without loading migration files, '
+                    'json lines of results go to stdout and logs to stderr.'
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--name",
+        type=str,
+        default=None,
+        dest='db_name',
+        help='''
+        Target id from config file.
+        ''',
+    )
+    add_tag_argument(group)
 
-    if target is None:
-        raise ValueError(
-            f"Given DB name not present in config {settings.CONFIG_PATH}"
-        )
 
-    source = parser.sources.get(
-        target.source,
-        None,
+def add_daemon_parser(subparsers):
+    parser = subparsers.add_parser(
+        'daemon',
+        description='Run long living migration daemon with json api over unix socket or localhost http, '
+                    'requests should be sent with Content-Type: application/json.'
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--socket",
+        type=str,
+        default=None,
+        dest='socket_path',
+        help='''
+        Unix socket path for daemon api.
+        ''',
+    )
+    group.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        dest='port',
+        help='''
+        Localhost port for daemon http api.
+        ''',
     )
 
-    if source is None:
-        raise ValueError(
-            f"Given migration source not present in config {settings.CONFIG_PATH}"
-        )
 
-    loader = source.get_loader()
-    runner = target.get_runner(loader)
+def add_watch_parser(subparsers):
+    parser = subparsers.add_parser(
+        'watch',
+        description='Watch migration sources and pre-load new migration files into local cache.'
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=30,
+        dest='interval',
+        help='''
+        Seconds between source polls.
+        ''',
+    )
+    parser.add_argument(
+        "--plan",
+        action='store_true',
+        dest='is_plan',
+        help='''
+        Flag for building migration plans of affected targets when source moves.
+        '''
+    )
+    parser.add_argument(
+        "--once",
+        action='store_true',
+        dest='is_once',
+        help='''
+        Flag for single poll without watching.
+        '''
+    )
 
-    return runner
 
+def add_bundle_parser(subparsers):
+    parser = subparsers.add_parser(
+        'bundle',
+        description='Write migration files of a source into a single bundle file.'
+    )
+    parser.add_argument(
+        "--source",
+        type=str,
+        required=True,
+        dest='source_id',
+        help='''
+        Source id from config file.
+        ''',
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        required=True,
+        dest='output_path',
+        help='''
+        Bundle file path.
+        ''',
+    )
 
-def main(args):
-    logger.info(f'CLI arguments: {args}')
 
-    db_name = args.db_name
-    from_version = args.start_version
-    is_drop = args.is_drop
-    to_version = args.target_version
+def add_survey_parser(subparsers):
+    parser = subparsers.add_parser(
+        'survey',
+        description='Concurrently read current versions of all or selected targets.'
+    )
+    add_tag_argument(parser)
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=5,
+        dest='timeout',
+        help='''
+        Per target connection and query timeout in seconds.
+        ''',
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=64,
+        dest='workers',
+        help='''
+        Count of concurrent target connections.
+        ''',
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=['table', 'json'],
+        default='table',
+        dest='output_format',
+        help='''
+        Output format.
+        ''',
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        dest='output_path',
+        help='''
+        File for survey results, required for json format because stdout is used by json logs.
+        ''',
+    )
+
+
+def add_validate_parser(subparsers):
+    parser = subparsers.add_parser(
+        'validate',
+        description='Validate migration scripts without running them. '
+                    'Whole source is checked with --source or --dir, migration path of target with --name.'
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "--source",
+        type=str,
+        default=None,
+        dest='source_id',
+        help='''
+        Source id from config file, all migration files of source are validated.
+        ''',
+    )
+    group.add_argument(
+        "--dir",
+        type=str,
+        default=None,
+        dest='files_dir',
+        help='''
+        Local directory with migration scripts, e.g. repository checkout in CI, all scripts are validated.
+        Config file is not required.
+        ''',
+    )
+    group.add_argument(
+        "--name",
+        type=str,
+        default=None,
+        dest='db_name',
+        help='''
+        Target id from config file, only migration path of target is validated.
+        ''',
+    )
+    parser.add_argument(
+        "--type",
+        type=str,
+        choices=[db_type.value for db_type in DBType],
+        default=DBType.Postgresql.value,
+        dest='db_type',
+        help='''
+        DB type for source scripts parsing.
+        ''',
+    )
+    parser.add_argument(
+        "--from",
+        type=version_value,
+        default=None,
+        dest='start_version',
+        help='''
+        Migration start version for path validation.
+        ''',
+    )
+    parser.add_argument(
+        "--to",
+        type=version_value,
+        default=None,
+        dest='target_version',
+        help='''
+        Migration target version for path validation.
+        ''',
+    )
+    parser.add_argument(
+        "--drop",
+        action='store_true',
+        dest='is_drop',
+        help='''
+        Flag for db re-initialization path validation.
+        '''
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        dest='workers',
+        help='''
+        Count of parsing processes, cpu count by default.
+        ''',
+    )
+
 
-    parser = MigrationsConfigParser(
-        config_path=settings.CONFIG_PATH,
+def add_rehearse_parser(subparsers):
+    parser = subparsers.add_parser(
+        'rehearse',
+        description='Run migration path on a scratch clone of postgresql target db and record timings. '
+                    'Scratch db is dropped afterwards unless --keep is given.'
+    )
+    add_name_argument(parser)
+    parser.add_argument(
+        "--from",
+        type=version_value,
+        default=None,
+        dest='start_version',
+        help='''
+        Migration start version, current version of target by default.
+        ''',
+    )
+    parser.add_argument(
+        "--to",
+        type=version_value,
+        required=True,
+        dest='target_version',
+        help='''
+        Migration target version.
+        ''',
+    )
+    parser.add_argument(
+        "--method",
+        type=str,
+        choices=['template', 'dump'],
+        default='template',
+        dest='method',
+        help='''
+        Clone method: CREATE DATABASE ... TEMPLATE (target must have no active sessions)
+        or pg_dump | pg_restore.
+        ''',
+    )
+    parser.add_argument(
+        "--scratch-host",
+        type=str,
+        default=None,
+        dest='scratch_host',
+        help='''
+        Host of server for scratch db, target server by default. Only for dump method.
+        ''',
+    )
+    parser.add_argument(
+        "--scratch-port",
+        type=str,
+        default=None,
+        dest='scratch_port',
+        help='''
+        Port of server for scratch db, target port by default. Only for dump method.
+        ''',
+    )
+    parser.add_argument(
+        "--keep",
+        action='store_true',
+        dest='is_keep',
+        help='''
+        Keep scratch db after rehearsal.
+        '''
     )
 
-    migration_runner = get_runner_for_db(db_name, parser)
 
-    migration_path = migration_runner.build_migration_path(
-        is_drop=is_drop,
-        from_version=from_version,
-        to_version=to_version,
+def add_drift_parser(subparsers):
+    parser = subparsers.add_parser(
+        'drift',
+        description='Compare live schema fingerprint of postgresql target with fingerprint '
+                    'recorded when its current version was applied. Fingerprints are computed while migration '
+                    'locks are held and are not recorded if MIGRATION_SCHEMA_FINGERPRINT is false.'
+    )
+    add_name_argument(parser)
+    parser.add_argument(
+        "--reference",
+        type=str,
+        default=None,
+        dest='reference',
+        help='''
+        Target id with expected fingerprints, checked target itself by default.
+        ''',
     )
 
-    migration_runner.sync(
-        migration_path,
+
+def parse_args(argv: Optional[List[str]] = None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    # keeping old style calls without command name working: cli --name db --to 1
+    if len(argv) > 0 and argv[0] not in COMMANDS and argv[0] not in ('-h', '--help'):
+        argv = [DEFAULT_COMMAND, *argv]
+
+    # create parser object
+    parser = argparse.ArgumentParser(
+        prog=PROG,
+        description='Manual migration tool.'
+    )
+    subparsers = parser.add_subparsers(
+        dest='command',
+        required=True,
     )
+    add_migrate_parser(subparsers)
+    add_status_parser(subparsers)
+    add_daemon_parser(subparsers)
+    add_watch_parser(subparsers)
+    add_bundle_parser(subparsers)
+    add_survey_parser(subparsers)
+    add_validate_parser(subparsers)
+    add_rehearse_parser(subparsers)
+    add_drift_parser(subparsers)
+
+    return parser.parse_args(argv)
+
+
+def setup_runtime(log_to_stderr: bool = False):
+    from migration_tool.logger.utils import init_logger
+
+    init_logger(log_to_stderr)
+    # getting only important messages from urllib3
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
+
+    if not platform.system() == 'Windows':
+        os.environ['TZ'] = 'Europe/Moscow'
+        getattr(time, 'tzset')()
+
+
+def main(args):
+    setup_runtime(log_to_stderr=args.command in RESULT_COMMANDS)
+
+    command = import_module(COMMANDS[args.command])
+    command.main(args)
 
 
 if __name__ == "__main__":
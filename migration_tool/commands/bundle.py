@@ -0,0 +1,19 @@
+from migration_tool.commands.utils import read_config
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.settings import get_settings
+
+logger = LoggerMixIn.init_logger()
+
+
+def main(args):
+    logger.info(f'CLI arguments: {args}')
+
+    parser = read_config()
+    source = parser.sources.get(args.source_id, None)
+
+    if source is None:
+        raise ValueError(
+            f"Given migration source not present in config {get_settings().CONFIG_PATH}"
+        )
+
+    source.get_loader().dump_bundle(args.output_path)
@@ -0,0 +1,13 @@
+from migration_tool.daemon.server import serve
+from migration_tool.logger.mix_in import LoggerMixIn
+
+logger = LoggerMixIn.init_logger()
+
+
+def main(args):
+    logger.info(f'CLI arguments: {args}')
+
+    serve(
+        socket_path=args.socket_path,
+        port=args.port,
+    )
@@ -0,0 +1,98 @@
+import dataclasses
+import json
+
+from sqlalchemy import create_engine, Engine
+
+from migration_tool.commands.utils import read_config, get_target
+from migration_tool.db_migration.postgresql import PostgreSQLMigrationRunner, APP_NAME
+from migration_tool.db_types import DBType
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.migration_meta.postgresql import PostgreSQLMigrationMeta
+from migration_tool.version_probe.postgresql import PostgreSQLVersionProbe
+
+logger = LoggerMixIn.init_logger()
+
+
+def get_postgresql_config(name, parser) -> MigrationConfig:
+    target = get_target(name, parser)
+    if DBType(target.type) != DBType.Postgresql:
+        raise ValueError(f"Drift detection is supported only for {DBType.Postgresql.value} targets")
+
+    # version and schema are read from primary, so replica lag is not reported as drift
+    return dataclasses.replace(target.get_config(), replicas=[])
+
+
+def get_engine(config: MigrationConfig) -> Engine:
+    return create_engine(
+        PostgreSQLMigrationRunner.build_uri(config, config.db_name),
+        connect_args={"application_name": APP_NAME},
+    )
+
+
+def main(args):
+    logger.debug(f'CLI arguments: {args}')
+
+    parser = read_config()
+    config = get_postgresql_config(args.db_name, parser)
+    reference_name = args.reference if args.reference is not None else args.db_name
+    reference_config = config if args.reference is None else get_postgresql_config(args.reference, parser)
+
+    # version is read by probe, runner meta would create meta storage on untracked db
+    version = PostgreSQLVersionProbe(config).read_version()
+    if version is None:
+        raise ValueError(f"Target DB {args.db_name} has no migration meta")
+
+    engine = get_engine(config)
+    reference_engine = engine if args.reference is None else get_engine(reference_config)
+    try:
+        check_drift(
+            args.db_name,
+            reference_name,
+            version,
+            PostgreSQLMigrationMeta(engine),
+            PostgreSQLMigrationMeta(reference_engine),
+        )
+    finally:
+        engine.dispose()
+        reference_engine.dispose()
+
+
+def check_drift(
+        name: str,
+        reference_name: str,
+        version: int,
+        meta: PostgreSQLMigrationMeta,
+        reference: PostgreSQLMigrationMeta,
+):
+    result = {
+        'name': name,
+        'reference': reference_name,
+        'version': version,
+    }
+    expected = reference.read_expected_fingerprint(version)
+    if expected is None:
+        print(json.dumps({**result, 'status': 'unknown'}))
+        raise SystemExit(1)
+
+    fingerprint = meta.read_live_fingerprint()
+    result.update(fingerprint=fingerprint, expected=expected['fingerprint'])
+    if fingerprint == expected['fingerprint']:
+        print(json.dumps({**result, 'status': 'ok'}))
+        return
+
+    # per object hashes are fetched only for mismatched schemas
+    live_objects = meta.read_live_objects()
+    expected_objects = expected['objects']
+    print(json.dumps({
+        **result,
+        'status': 'drift',
+        'missing': sorted(expected_objects.keys() - live_objects.keys()),
+        'unexpected': sorted(live_objects.keys() - expected_objects.keys()),
+        'changed': sorted(
+            object_name
+            for object_name in live_objects.keys() & expected_objects.keys()
+            if live_objects[object_name] != expected_objects[object_name]
+        ),
+    }))
+    raise SystemExit(1)
@@ -0,0 +1,25 @@
+from migration_tool.commands.utils import read_config, get_runner_for_db
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.logger.utils import bind_log_context
+
+logger = LoggerMixIn.init_logger()
+
+
+def main(args):
+    logger.info(f'CLI arguments: {args}')
+
+    db_name = args.db_name
+    from_version = args.start_version
+    is_drop = args.is_drop
+    to_version = args.target_version
+
+    parser = read_config()
+
+    with bind_log_context(target=db_name):
+        migration_runner = get_runner_for_db(db_name, parser)
+
+        migration_runner.migrate(
+            is_drop=is_drop,
+            from_version=from_version,
+            to_version=to_version,
+        )
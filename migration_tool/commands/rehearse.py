@@ -0,0 +1,41 @@
+from migration_tool.commands.utils import read_config, get_target, get_loader_for_target, get_timing_store
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.logger.utils import bind_log_context
+from migration_tool.rehearsal import PostgreSQLRehearsal
+
+logger = LoggerMixIn.init_logger()
+
+
+def main(args):
+    logger.info(f'CLI arguments: {args}')
+
+    parser = read_config()
+    target = get_target(args.db_name, parser)
+
+    with bind_log_context(target=target.id, rehearsal=True):
+        rehearsal = PostgreSQLRehearsal(
+            config=target.get_config(),
+            files_loader=get_loader_for_target(target, parser),
+            method=args.method,
+            scratch_host=args.scratch_host,
+            scratch_port=args.scratch_port,
+        )
+        timings = rehearsal.run(
+            from_version=args.start_version,
+            to_version=args.target_version,
+            is_keep=args.is_keep,
+        )
+
+    store = get_timing_store()
+    if store is not None:
+        store.record(target.id, timings, is_rehearsal=True)
+
+    lines = [f"{'VERSION':<8} {'DIRECTION':<10} {'DURATION':>10}  LOCKS"]
+    for timing in timings:
+        lines.append(
+            f"{timing.version:<8} {timing.direction:<10} {timing.duration:>9.2f}s  {', '.join(timing.locks)}".rstrip()
+        )
+    lines.append(f"Total: {sum(timing.duration for timing in timings):.2f}s")
+    if args.is_keep:
+        lines.append(f"Scratch db kept: {rehearsal.scratch_config.db_name}")
+    print('\n'.join(lines))
@@ -0,0 +1,22 @@
+import json
+
+from migration_tool.commands.utils import read_config, get_target
+from migration_tool.logger.mix_in import LoggerMixIn
+
+logger = LoggerMixIn.init_logger()
+
+
+def main(args):
+    logger.debug(f'CLI arguments: {args}')
+
+    parser = read_config()
+    names = [args.db_name] if args.db_name is not None else parser.select(args.tags)
+
+    for name in names:
+        target = get_target(name, parser)
+        version = target.get_probe().read_version()
+
+        print(json.dumps({
+            'name': target.id,
+            'version': version,
+        }))
@@ -0,0 +1,53 @@
+import dataclasses
+import json
+
+from migration_tool.commands.utils import read_config
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.survey import FleetSurvey
+
+logger = LoggerMixIn.init_logger()
+
+TABLE_COLUMNS = ['name', 'source', 'version', 'latest_version', 'status', 'duration', 'error']
+
+
+def print_table(rows, file=None):
+    values = [
+        ['' if row[column] is None else str(row[column]) for column in TABLE_COLUMNS]
+        for row in rows
+    ]
+    widths = [
+        max([len(column)] + [len(row[i]) for row in values])
+        for i, column in enumerate(TABLE_COLUMNS)
+    ]
+
+    print('  '.join(column.ljust(width) for column, width in zip(TABLE_COLUMNS, widths)).rstrip(), file=file)
+    for row in values:
+        print('  '.join(value.ljust(width) for value, width in zip(row, widths)).rstrip(), file=file)
+
+
+def main(args):
+    logger.debug(f'CLI arguments: {args}')
+
+    if args.output_format == 'json' and args.output_path is None:
+        raise ValueError("Json survey output requires --output, stdout is used by json logs")
+
+    parser = read_config()
+    survey = FleetSurvey(
+        parser=parser,
+        timeout=args.timeout,
+        workers=args.workers,
+    )
+
+    results = survey.run(parser.select(args.tags))
+    rows = [dataclasses.asdict(result) for result in results]
+
+    if args.output_path is None:
+        print_table(rows)
+        return
+
+    with open(args.output_path, 'w', encoding="utf-8") as file:
+        if args.output_format == 'json':
+            json.dump(rows, file)
+        else:
+            print_table(rows, file)
+    logger.info(f"Survey results of {len(rows)} targets written to {args.output_path}")
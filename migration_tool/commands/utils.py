@@ -0,0 +1,69 @@
+import os
+from typing import Optional, TYPE_CHECKING
+
+from migration_tool.config_parser.parser import MigrationsConfigParser
+from migration_tool.config_parser.targets import TargetDB
+from migration_tool.settings import get_settings
+from migration_tool.timings import TimingStore
+
+if TYPE_CHECKING:
+    from migration_tool.db_migration.base import DBMigrationRunner
+    from migration_tool.migration_files.loader.base import MigrationFilesLoader
+
+
+class UnknownTargetError(ValueError):
+    pass
+
+
+def read_config() -> MigrationsConfigParser:
+    settings = get_settings()
+
+    return MigrationsConfigParser(
+        config_path=settings.CONFIG_PATH,
+        cache_dir=settings.MIGRATION_CACHE_DIR,
+    )
+
+
+def get_timing_store() -> Optional[TimingStore]:
+    settings = get_settings()
+
+    if settings.MIGRATION_TIMINGS_PATH is not None:
+        return TimingStore(settings.MIGRATION_TIMINGS_PATH)
+    if settings.MIGRATION_CACHE_DIR is not None:
+        return TimingStore(os.path.join(settings.MIGRATION_CACHE_DIR, 'timings.sqlite'))
+
+    return None
+
+
+def get_target(name: str, parser: MigrationsConfigParser) -> TargetDB:
+    target = parser.targets.get(name, None)
+
+    if target is None:
+        raise UnknownTargetError(
+            f"Given DB name {name} not present in config {get_settings().CONFIG_PATH}"
+        )
+
+    return target
+
+
+def get_loader_for_target(target: TargetDB, parser: MigrationsConfigParser) -> 'MigrationFilesLoader':
+    source = parser.sources.get(
+        target.source,
+        None,
+    )
+
+    if source is None:
+        raise ValueError(
+            f"Given migration source not present in config {get_settings().CONFIG_PATH}"
+        )
+
+    return source.get_loader()
+
+
+def get_runner_for_db(name: str, parser: MigrationsConfigParser) -> 'DBMigrationRunner':
+    target = get_target(name, parser)
+
+    runner = target.get_runner(get_loader_for_target(target, parser))
+    runner.timing_store = get_timing_store()
+
+    return runner
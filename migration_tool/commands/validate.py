@@ -0,0 +1,61 @@
+from migration_tool.commands.utils import read_config, get_runner_for_db
+from migration_tool.db_types import DBType
+from migration_tool.dialects import get_dialect
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.migration_files.loader.directory import (
+    FromDirectoryMigrationFilesLoader,
+    FromDirectoryMigrationFilesLoaderConfig,
+)
+from migration_tool.migration_files.validation import MigrationFilesValidator
+from migration_tool.settings import get_settings
+
+logger = LoggerMixIn.init_logger()
+
+
+def get_source_loader(args) -> MigrationFilesLoader:
+    if args.files_dir is not None:
+        return FromDirectoryMigrationFilesLoader(FromDirectoryMigrationFilesLoaderConfig(args.files_dir))
+
+    source = read_config().sources.get(args.source_id, None)
+    if source is None:
+        raise ValueError(
+            f"Given migration source not present in config {get_settings().CONFIG_PATH}"
+        )
+
+    return source.get_loader()
+
+
+def main(args):
+    logger.info(f'CLI arguments: {args}')
+
+    if args.source_id is not None or args.files_dir is not None:
+        dialect = get_dialect(DBType(args.db_type))
+        validator = MigrationFilesValidator(
+            sql_parser=dialect.sql_parser,
+            workers=args.workers,
+            allow_directives=dialect.capabilities.session_directives,
+        )
+        issues = validator.validate_files(get_source_loader(args).load_files_list())
+    else:
+        if args.target_version is None:
+            raise ValueError("Target version is required for path validation")
+
+        runner = get_runner_for_db(args.db_name, read_config())
+        path = runner.build_migration_path(
+            is_drop=args.is_drop,
+            from_version=args.start_version,
+            to_version=args.target_version,
+        )
+        issues = runner.get_validator(workers=args.workers).validate_path(
+            runner.migration_files_map,
+            [(version, migration_type.value) for version, migration_type in path],
+        )
+
+    for issue in issues:
+        print(issue)
+
+    if len(issues) > 0:
+        raise SystemExit(1)
+
+    logger.info(f"Validation passed")
@@ -0,0 +1,20 @@
+from migration_tool.commands.utils import read_config
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.watcher import SourcesWatcher
+
+logger = LoggerMixIn.init_logger()
+
+
+def main(args):
+    logger.info(f'CLI arguments: {args}')
+
+    watcher = SourcesWatcher(
+        parser=read_config(),
+        is_plan=args.is_plan,
+    )
+
+    if args.is_once:
+        watcher.poll()
+        return
+
+    watcher.run(args.interval)
@@ -1,40 +1,159 @@
+import hashlib
+import json
+import os
+from collections.abc import Mapping
 from pathlib import Path
-from typing import List
+from typing import List, Dict, Set, Optional, Iterator, Any
 
 from migration_tool.config_parser.sources import prepare_source
-from migration_tool.config_parser.targets import prepare_target
+from migration_tool.config_parser.targets import prepare_target, TargetDB
 from migration_tool.logger.mix_in import LoggerMixIn
 import yaml
 
+# C loader is several times faster on big configs, falling back if libyaml is not available
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 ROOT = Path(__file__).parent.parent.parent
 
 
+class TargetsInventory(Mapping):
+    """
+    Validated targets configs, target objects are built only on access.
+    """
+
+    def __init__(self, raw_targets: Dict[str, Dict[str, Any]]):
+        self._raw_targets = raw_targets
+        self._targets: Dict[str, TargetDB] = {}
+
+    def __getitem__(self, name: str) -> TargetDB:
+        target = self._targets.get(name)
+        if target is None:
+            target = prepare_target(self._raw_targets[name])
+            self._targets[name] = target
+
+        return target
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw_targets)
+
+    def __len__(self) -> int:
+        return len(self._raw_targets)
+
+
 class MigrationsConfigParser(LoggerMixIn):
     SOURCES = 'sources'
     TARGET = 'db'
+    TAGS = 'tags'
+    GROUPS = 'groups'
+    # cache is plain json, so a writable cache dir can't be used to run code as the tool
+    CACHE_FORMAT_VERSION = 2
 
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, cache_dir: Optional[str] = None):
         self._config_path = ROOT / config_path
+        self._cache_path = (
+            Path(cache_dir) / f"config_{hashlib.sha256(str(self._config_path).encode()).hexdigest()[:16]}.json"
+            if cache_dir is not None
+            else None
+        )
+
+        inventory = self._read_inventory()
+
+        self.sources = {
+            source_id: prepare_source(source_config)
+            for source_id, source_config in inventory['sources'].items()
+        }
+        self.targets = TargetsInventory(inventory['targets'])
+        self._tags_index: Dict[str, Set[str]] = {
+            tag: set(target_ids)
+            for tag, target_ids in inventory['tags_index'].items()
+        }
+
+    def _read_cache(self, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        if self._cache_path is None or not self._cache_path.exists():
+            return None
+
+        try:
+            with open(self._cache_path, 'r', encoding="utf-8") as file:
+                cache = json.load(file)
+        except Exception as e:
+            self.logger.warning(f"Can't read config cache {self._cache_path}: {e}")
+            return None
+
+        if not isinstance(cache, dict) or cache.get('format_version') != self.CACHE_FORMAT_VERSION:
+            return None
+
+        if cache['mtime_ns'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+            return cache
+
+        # file was touched, but content may still be the same
+        with open(self._config_path, 'rb') as file:
+            if hashlib.sha256(file.read()).hexdigest() != cache['sha256']:
+                return None
+
+        self._write_cache(stat, cache['sha256'], cache['inventory'])
+        return cache
+
+    def _write_cache(self, stat: os.stat_result, sha256: str, inventory: Dict[str, Any]):
+        if self._cache_path is None:
+            return
+
+        cache = {
+            'format_version': self.CACHE_FORMAT_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': sha256,
+            'inventory': inventory,
+        }
+
+        try:
+            data = json.dumps(cache)
+        except (TypeError, ValueError) as e:
+            # yaml values without json representation, like dates, are left uncached
+            self.logger.warning(f"Can't serialize config cache {self._cache_path}: {e}")
+            return
+
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding="utf-8") as file:
+                file.write(data)
+            os.replace(tmp_path, self._cache_path)
+        except OSError as e:
+            self.logger.warning(f"Can't write config cache {self._cache_path}: {e}")
+
+    def _read_inventory(self) -> Dict[str, Any]:
+        stat = os.stat(self._config_path)
+
+        cache = self._read_cache(stat)
+        if cache is not None:
+            self.logger.debug(f"Using cached config inventory: {self._cache_path}")
+            return cache['inventory']
 
         self.logger.debug(f"Reading config file: {self._config_path}")
 
-        with open(self._config_path, 'r') as file:
-            self._raw_config = yaml.safe_load(file)
+        with open(self._config_path, 'rb') as file:
+            content = file.read()
+
+        raw_config = yaml.load(content, Loader=YamlLoader)
+        inventory = self._build_inventory(raw_config)
+        self._write_cache(stat, hashlib.sha256(content).hexdigest(), inventory)
 
-        if self.SOURCES not in self._raw_config or not isinstance(self._raw_config[self.SOURCES], List):
+        return inventory
+
+    def _build_inventory(self, raw_config: Dict) -> Dict[str, Any]:
+        if self.SOURCES not in raw_config or not isinstance(raw_config[self.SOURCES], List):
             raise ValueError(
-                f"Can't read '{self.SOURCES}' config fragment list from config: {self._raw_config}"
+                f"Can't read '{self.SOURCES}' config fragment list from config: {raw_config}"
             )
 
-        if self.TARGET not in self._raw_config or not isinstance(self._raw_config[self.TARGET], List):
+        if self.TARGET not in raw_config or not isinstance(raw_config[self.TARGET], List):
             raise ValueError(
-                f"Can't read '{self.TARGET}' config fragment list from config: {self._raw_config}"
+                f"Can't read '{self.TARGET}' config fragment list from config: {raw_config}"
             )
 
         sources = {}
 
-        for source_config in self._raw_config[self.SOURCES]:
+        for source_config in raw_config[self.SOURCES]:
             source_obj = prepare_source(source_config)
 
             if source_obj.id in sources:
@@ -42,11 +161,13 @@ class MigrationsConfigParser(LoggerMixIn):
                     f"Received duplicates ids '{source_obj.id}' for sources"
                 )
 
-            sources[source_obj.id] = source_obj
+            sources[source_obj.id] = source_config
 
         targets = {}
+        tags_index: Dict[str, List[str]] = {}
 
-        for target_config in self._raw_config[self.TARGET]:
+        for target_config in raw_config[self.TARGET]:
+            # building object only for config validation, targets are materialized again on access
             target_object = prepare_target(target_config)
 
             if target_object.id in targets:
@@ -59,7 +180,29 @@ class MigrationsConfigParser(LoggerMixIn):
                     f"Target DB: {target_object.id} used unknown source {target_object.source}"
                 )
 
-            targets[target_object.id] = target_object
-
-        self.targets = targets
-        self.sources = sources
+            targets[target_object.id] = target_config
+
+            for key, value in target_object.tags.items():
+                tags_index.setdefault(f"{key}={value}", []).append(target_object.id)
+            for group in target_object.groups:
+                tags_index.setdefault(group, []).append(target_object.id)
+
+        return {
+            'sources': sources,
+            'targets': targets,
+            'tags_index': tags_index,
+        }
+
+    def select(self, tags: List[str]) -> List[str]:
+        """
+        Select targets ids by tags.
+        Parameters:
+            tags (List[str]): 'key=value' tags or group names, target should match all of them.
+        Returns:
+            ids (List[str]): ids of matched targets in config order, all ids if no tags given.
+        """
+        selected = set(self.targets)
+        for tag in tags:
+            selected &= self._tags_index.get(tag, set())
+
+        return [target_id for target_id in self.targets if target_id in selected]
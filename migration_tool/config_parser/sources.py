@@ -6,9 +6,6 @@ from typing import List, Dict
 
 from migration_tool.migration_files.file import MigrationFile
 from migration_tool.migration_files.loader.base import MigrationFilesLoader
-from migration_tool.migration_files.loader.git_hub import FromGitHubRepoMigrationFilesLoaderConfig, \
-    FromGitHubRepoMigrationFilesLoader
-from migration_tool.settings import settings
 
 
 @dataclasses.dataclass
@@ -34,9 +31,14 @@ class GitHubMigrationsFileSource(MigrationFilesSource):
     path: str
 
     def get_loader(self) -> MigrationFilesLoader:
+        # PyGithub is heavy to import, so it is loaded only when the loader is really needed
+        from migration_tool.migration_files.loader.git_hub import FromGitHubRepoMigrationFilesLoaderConfig, \
+            FromGitHubRepoMigrationFilesLoader
+        from migration_tool.settings import get_settings
+
         pat_name = f"{self.id}_PAT".lower()
 
-        pat_value = getattr(settings, pat_name)
+        pat_value = getattr(get_settings(), pat_name)
         if pat_value is None:
             raise ValueError(
                 f"For config: {self.id} is env variable {pat_name} is required"
@@ -48,12 +50,31 @@ class GitHubMigrationsFileSource(MigrationFilesSource):
             repo_owner=self.repo_owner,
             migration_files_dir=self.path,
             github_pat_value=pat_value,
+            cache_dir=get_settings().MIGRATION_CACHE_DIR,
         )
         loader = FromGitHubRepoMigrationFilesLoader(loader_config)
 
         return loader
 
 
+@dataclasses.dataclass
+class BundleMigrationsFileSource(MigrationFilesSource):
+    TYPE_NAME = 'bundle'
+
+    path: str
+
+    def get_loader(self) -> MigrationFilesLoader:
+        from migration_tool.migration_files.loader.bundle import FromBundleMigrationFilesLoaderConfig, \
+            FromBundleMigrationFilesLoader
+
+        loader_config = FromBundleMigrationFilesLoaderConfig(
+            bundle_path=self.path,
+        )
+        loader = FromBundleMigrationFilesLoader(loader_config)
+
+        return loader
+
+
 def prepare_for_github(config: Dict) -> MigrationFilesSource:
     if TYPE_KEYWORD not in config or config[TYPE_KEYWORD] != GitHubMigrationsFileSource.TYPE_NAME:
         raise ValueError(
@@ -72,10 +93,26 @@ def prepare_for_github(config: Dict) -> MigrationFilesSource:
     return source
 
 
+def prepare_for_bundle(config: Dict) -> MigrationFilesSource:
+    if TYPE_KEYWORD not in config or config[TYPE_KEYWORD] != BundleMigrationsFileSource.TYPE_NAME:
+        raise ValueError(
+            f"From given config: {config} can't find correct type name: {BundleMigrationsFileSource.TYPE_NAME}"
+        )
+
+    source = BundleMigrationsFileSource(
+        id=config['id'],
+        type=config['type'],
+        path=config['path'],
+    )
+
+    return source
+
+
 def prepare_source(config: Dict) -> MigrationFilesSource:
     type_name = config.get(TYPE_KEYWORD)
     source_map = {
         GitHubMigrationsFileSource.TYPE_NAME: prepare_for_github,
+        BundleMigrationsFileSource.TYPE_NAME: prepare_for_bundle,
     }
 
     if type_name is None:
@@ -1,13 +1,15 @@
 import abc
 import dataclasses
-from typing import Dict
+from typing import Dict, List, Optional, Type, TYPE_CHECKING
 
-from migration_tool.db_migration.base import DBMigrationRunner
-from migration_tool.db_migration.postgresql import PostgreSQLMigrationRunner
 from migration_tool.db_types import DBType
+from migration_tool.dialects import get_dialect
 from migration_tool.migration_config import MigrationConfig
 from migration_tool.migration_files.loader.base import MigrationFilesLoader
-from migration_tool.settings import settings
+from migration_tool.version_probe.base import VersionProbe
+
+if TYPE_CHECKING:
+    from migration_tool.db_migration.base import DBMigrationRunner
 
 
 @dataclasses.dataclass
@@ -16,15 +18,41 @@ class TargetDB:
     type: str
     name: str
     source: str
+    tags: Dict[str, str] = dataclasses.field(default_factory=dict)
+    groups: List[str] = dataclasses.field(default_factory=list)
 
     @abc.abstractmethod
-    def get_runner(self, loader: MigrationFilesLoader) -> DBMigrationRunner:
+    def get_config(self) -> MigrationConfig:
         raise NotImplementedError()
 
+    def get_runner(self, loader: MigrationFilesLoader) -> 'DBMigrationRunner':
+        # runner classes are heavy to import, so they are loaded only when they are really needed
+        runner_class = get_dialect(DBType(self.type)).get_runner_class()
+
+        runner = runner_class(
+            config=self.get_config(),
+            files_loader=loader
+        )
+
+        return runner
+
+    def get_probe(self, timeout: Optional[float] = None) -> VersionProbe:
+        probe_class = get_dialect(DBType(self.type)).get_probe_class()
+
+        return probe_class(
+            config=self.get_config(),
+            timeout=timeout,
+        )
+
 
 @dataclasses.dataclass
-class TargetPSQLDB(TargetDB):
-    def get_runner(self, loader: MigrationFilesLoader) -> DBMigrationRunner:
+class TargetServerDB(TargetDB):
+    def get_config(self) -> MigrationConfig:
+        from migration_tool.settings import get_settings
+
+        settings = get_settings()
+        # extra env values are stored with lower case keys
+        env_values = settings.model_extra or {}
         env_mapping = {
             'db_user': f"{self.id}_USER",
             'db_pass': f"{self.id}_USER_PASSWORD",
@@ -32,30 +60,121 @@ class TargetPSQLDB(TargetDB):
             'db_host': f"{self.id}_HOST",
         }
 
-        args = {
-            k: getattr(settings, v.lower())
-            for k, v in env_mapping.items()
-        }
+        args = {}
+        for k, v in env_mapping.items():
+            if v.lower() not in env_values:
+                raise ValueError(
+                    f"For target: {self.id} is env variable {v} is required"
+                )
+            args[k] = env_values[v.lower()]
+
         args['db_type'] = DBType(self.type)
         args['db_name'] = self.name
+        args['target_id'] = self.id
+        args['lock_timeout'] = settings.MIGRATION_LOCK_TIMEOUT
+        args['blocker_wait_budget'] = settings.MIGRATION_BLOCKER_WAIT_BUDGET
+        args['blocker_policy'] = settings.MIGRATION_BLOCKER_POLICY
+        args['idle_terminate_after'] = settings.MIGRATION_IDLE_TERMINATE_AFTER
+        args['ddl_lock_timeout'] = settings.MIGRATION_DDL_LOCK_TIMEOUT
+        args['record_fingerprint'] = settings.MIGRATION_SCHEMA_FINGERPRINT
 
-        config = MigrationConfig(
+        return MigrationConfig(
             **args,
         )
 
-        runner = PostgreSQLMigrationRunner(
-            config=config,
-            files_loader=loader
+
+@dataclasses.dataclass
+class TargetPSQLDB(TargetServerDB):
+    replicas: List[str] = dataclasses.field(default_factory=list)
+    max_replica_lag: Optional[int] = None
+
+    def get_config(self) -> MigrationConfig:
+        from migration_tool.settings import get_settings
+
+        config = super().get_config()
+        config.replicas = list(self.replicas)
+        config.max_replica_lag = self.max_replica_lag
+        config.replica_wait_budget = get_settings().MIGRATION_REPLICA_WAIT_BUDGET
+
+        return config
+
+
+@dataclasses.dataclass
+class TargetMySQLDB(TargetServerDB):
+    pass
+
+
+@dataclasses.dataclass
+class TargetSQLiteDB(TargetDB):
+    """
+    SQLite target, name is the path of db file.
+    """
+    def get_config(self) -> MigrationConfig:
+        from migration_tool.settings import get_settings
+
+        return MigrationConfig(
+            db_name=self.name,
+            db_type=DBType(self.type),
+            db_user=None,
+            db_pass=None,
+            db_port=None,
+            db_host=None,
+            target_id=self.id,
+            lock_timeout=get_settings().MIGRATION_LOCK_TIMEOUT,
         )
 
-        return runner
+
+TARGET_TYPES: Dict[DBType, Type[TargetDB]] = {
+    DBType.Postgresql: TargetPSQLDB,
+    DBType.Mysql: TargetMySQLDB,
+    DBType.Sqlite: TargetSQLiteDB,
+}
 
 
 def prepare_target(config: Dict) -> TargetDB:
-    # todo  mapping for different types
-    return TargetPSQLDB(
+    db_type = DBType(config['type'])
+    # validating that dialect is registered on config reading, not on first runner usage
+    get_dialect(db_type)
+
+    target_class = TARGET_TYPES.get(db_type, TargetServerDB)
+
+    tags = config.get('tags', {})
+    if not isinstance(tags, Dict):
+        raise ValueError(f"Target DB: {config['id']} tags should be a mapping, received: {tags}")
+
+    groups = config.get('groups', [])
+    if not isinstance(groups, List):
+        raise ValueError(f"Target DB: {config['id']} groups should be a list, received: {groups}")
+
+    replica_args = {}
+    if 'replicas' in config or 'max_replica_lag' in config:
+        if target_class is not TargetPSQLDB:
+            raise ValueError(f"Target DB: {config['id']} replicas are supported only for {DBType.Postgresql.value}")
+
+        replicas = config.get('replicas', [])
+        if not isinstance(replicas, List):
+            raise ValueError(f"Target DB: {config['id']} replicas should be a list, received: {replicas}")
+
+        max_replica_lag = config.get('max_replica_lag', None)
+        if max_replica_lag is not None and (not isinstance(max_replica_lag, int) or max_replica_lag < 0):
+            raise ValueError(
+                f"Target DB: {config['id']} max_replica_lag should be a non negative count of bytes, "
+                f"received: {max_replica_lag}"
+            )
+        if max_replica_lag is not None and len(replicas) == 0:
+            raise ValueError(f"Target DB: {config['id']} max_replica_lag requires replicas")
+
+        replica_args = {
+            'replicas': [str(replica) for replica in replicas],
+            'max_replica_lag': max_replica_lag,
+        }
+
+    return target_class(
         id=config['id'],
         type=config['type'],
         source=config['source'],
         name=config['name'],
+        tags={str(k): str(v) for k, v in tags.items()},
+        groups=[str(group) for group in groups],
+        **replica_args,
     )
@@ -0,0 +1,210 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Set
+
+from migration_tool.commands.utils import UnknownTargetError
+from migration_tool.daemon.state import MigrationDaemonState
+from migration_tool.logger.mix_in import LoggerMixIn
+
+
+class BadRequestError(ValueError):
+    pass
+
+
+class MigrationDaemonRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON api of the daemon:
+        POST /plan   {"name": str, "from": int|null, "to": int, "drop": bool, "refresh": bool}
+        POST /apply  {"name": str, "from": int|null, "to": int, "drop": bool, "refresh": bool}
+        POST /status {"name": str}
+        POST /reload {}
+    Requests should have 'Content-Type: application/json', so browsers can't send them as simple cross origin
+    requests, and http requests should have local Host header against dns rebinding.
+    """
+    server: 'DaemonServerMixIn'
+    logger = LoggerMixIn.init_logger('daemon.request')
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length', 0))
+        if length == 0:
+            return {}
+
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            raise BadRequestError(f"Request body is not valid json: {e}")
+        if not isinstance(body, dict):
+            raise BadRequestError(f"Request body should be json object, received: {body}")
+
+        return body
+
+    def _send_json(self, status: HTTPStatus, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def _name_arg(body: Dict[str, Any]) -> str:
+        name = body.get('name')
+        if not isinstance(name, str):
+            raise BadRequestError(f"Field 'name' should be a string, received: {name}")
+
+        return name
+
+    @staticmethod
+    def _version_arg(body: Dict[str, Any], field: str) -> Optional[int]:
+        value = body.get(field)
+        if value is None:
+            return None
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise BadRequestError(f"Field '{field}' should be a non negative integer, received: {value}")
+
+        return value
+
+    @classmethod
+    def _migration_args(cls, body: Dict[str, Any]) -> Dict[str, Any]:
+        to_version = cls._version_arg(body, 'to')
+        if to_version is None:
+            raise BadRequestError("Field 'to' is required")
+
+        return {
+            'name': cls._name_arg(body),
+            'is_drop': bool(body.get('drop', False)),
+            'from_version': cls._version_arg(body, 'from'),
+            'to_version': to_version,
+            'refresh': bool(body.get('refresh', False)),
+        }
+
+    def _check_origin(self) -> bool:
+        allowed_hosts = self.server.allowed_hosts
+        if allowed_hosts is not None and self.headers.get('Host') not in allowed_hosts:
+            self._send_json(HTTPStatus.FORBIDDEN, {'error': f"Host not allowed: {self.headers.get('Host')}"})
+            return False
+
+        if self.headers.get_content_type() != 'application/json':
+            self._send_json(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                {'error': f"Content-Type should be application/json, received: {self.headers.get('Content-Type')}"},
+            )
+            return False
+
+        return True
+
+    def do_POST(self):
+        state = self.server.state
+        if not self._check_origin():
+            return
+
+        try:
+            body = self._read_body()
+
+            if self.path == '/plan':
+                args = self._migration_args(body)
+                payload = {'name': args['name'], 'path': state.plan(**args)}
+            elif self.path == '/apply':
+                args = self._migration_args(body)
+                payload = {'name': args['name'], 'version': state.apply(**args)}
+            elif self.path == '/status':
+                name = self._name_arg(body)
+                payload = {'name': name, 'version': state.status(name)}
+            elif self.path == '/reload':
+                state.reload()
+                payload = {}
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown path: {self.path}"})
+                return
+        except (BadRequestError, UnknownTargetError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': repr(e)})
+            return
+        except Exception as e:
+            self.logger.exception(f"Request {self.path} failed")
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': repr(e)})
+            return
+
+        self._send_json(HTTPStatus.OK, payload)
+
+    def address_string(self):
+        # unix socket clients have no address
+        return str(self.client_address[0]) if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        self.logger.debug(f"{self.address_string()} {format % args}")
+
+
+class DaemonServerMixIn:
+    daemon_threads = True
+    state: MigrationDaemonState
+    # values of Host header accepted by server, not checked if None
+    allowed_hosts: Optional[Set[str]] = None
+
+
+class MigrationDaemonHTTPServer(DaemonServerMixIn, ThreadingHTTPServer):
+    def __init__(self, state: MigrationDaemonState, port: int, host: str = '127.0.0.1'):
+        self.state = state
+        super().__init__((host, port), MigrationDaemonRequestHandler)
+        # port 0 is resolved by bind
+        port = self.server_address[1]
+        self.allowed_hosts = {f"{host}:{port}", f"localhost:{port}"}
+
+
+class MigrationDaemonUnixServer(DaemonServerMixIn, socketserver.ThreadingUnixStreamServer):
+    def __init__(self, state: MigrationDaemonState, socket_path: str):
+        self.state = state
+        self._remove_stale_socket(socket_path)
+
+        # socket is created accessible only by daemon user
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, MigrationDaemonRequestHandler)
+        finally:
+            os.umask(umask)
+
+    @staticmethod
+    def _remove_stale_socket(socket_path: str):
+        if not os.path.exists(socket_path):
+            return
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            raise ValueError(f"Socket path {socket_path} exists and is not a socket")
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            try:
+                client.connect(socket_path)
+            except ConnectionRefusedError:
+                # left by a daemon which was not stopped cleanly
+                os.unlink(socket_path)
+                return
+
+        raise RuntimeError(f"Another daemon is listening on socket {socket_path}")
+
+
+def serve(socket_path: Optional[str] = None, port: Optional[int] = None):
+    logger = LoggerMixIn.init_logger('daemon')
+    state = MigrationDaemonState()
+
+    if socket_path is not None:
+        server = MigrationDaemonUnixServer(state, socket_path)
+        logger.info(f"Daemon listening on unix socket: {socket_path}")
+    elif port is not None:
+        server = MigrationDaemonHTTPServer(state, port)
+        logger.info(f"Daemon listening on http://127.0.0.1:{port}")
+    else:
+        raise ValueError("Daemon requires unix socket path or port")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info(f"Daemon stopping")
+    finally:
+        server.server_close()
+        state.shutdown()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
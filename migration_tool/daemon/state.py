@@ -0,0 +1,154 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional, Callable, Any
+
+from migration_tool.commands.utils import read_config, get_target, get_runner_for_db
+from migration_tool.config_parser.parser import MigrationsConfigParser
+from migration_tool.db_migration.base import DBMigrationRunner
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.logger.utils import bind_log_context
+
+
+class MigrationDaemonState(LoggerMixIn):
+    """
+    Long living state of the daemon: parsed config, runners with warm engines
+    and loaded migration files, and a single worker queue per target.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._parser: MigrationsConfigParser = read_config()
+        self._runners: Dict[str, DBMigrationRunner] = {}
+        self._queues: Dict[str, ThreadPoolExecutor] = {}
+        # source revisions of loaded migration files by target
+        self._etags: Dict[str, Optional[str]] = {}
+        self._revisions: Dict[str, str] = {}
+
+    def _get_runner(self, name: str) -> DBMigrationRunner:
+        with self._lock:
+            runner = self._runners.get(name)
+            if runner is None:
+                self.logger.info(f"Creating runner for target: {name}")
+                runner = get_runner_for_db(name, self._parser)
+                self._runners[name] = runner
+
+        return runner
+
+    def _submit(self, name: str, task: Callable[[DBMigrationRunner], Any]) -> Future:
+        # validating name before queue creation, so unknown names do not leave empty queues
+        get_target(name, self._parser)
+
+        with self._lock:
+            queue = self._queues.get(name)
+            if queue is None:
+                queue = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"target-{name}")
+                self._queues[name] = queue
+
+        return queue.submit(self._run_task, name, task)
+
+    def _refresh_if_moved(self, name: str, runner: DBMigrationRunner):
+        """
+        Drop loaded migration files of runner when its source revision changed since files were loaded.
+        """
+        try:
+            revision, etag = runner.migration_files_loader.poll_revision(self._etags.get(name))
+        except NotImplementedError:
+            return
+
+        self._etags[name] = etag
+        if revision is None or self._revisions.get(name) == revision:
+            return
+
+        if name in self._revisions:
+            self.logger.info(f"Source of target {name} moved to revision: {revision}, dropping loaded files")
+            runner.reset_migration_files()
+        self._revisions[name] = revision
+
+    def _run_task(self, name: str, task: Callable[[DBMigrationRunner], Any]) -> Any:
+        with bind_log_context(target=name):
+            runner = self._get_runner(name)
+            self._refresh_if_moved(name, runner)
+
+            try:
+                return task(runner)
+            finally:
+                # meta reads leave connection in transaction, idle session would hold back vacuum until next task
+                runner.migration_meta.close()
+
+    def plan(
+            self,
+            name: str,
+            is_drop: bool = False,
+            from_version: Optional[int] = None,
+            to_version: int = 0,
+            refresh: bool = False,
+    ) -> List[List]:
+        def task(runner: DBMigrationRunner):
+            if refresh:
+                runner.reset_migration_files()
+
+            path = runner.build_migration_path(
+                is_drop=is_drop,
+                from_version=from_version,
+                to_version=to_version,
+            )
+
+            return [[version, migration_type.value] for version, migration_type in path]
+
+        return self._submit(name, task).result()
+
+    def apply(
+            self,
+            name: str,
+            is_drop: bool = False,
+            from_version: Optional[int] = None,
+            to_version: int = 0,
+            refresh: bool = False,
+    ) -> Optional[int]:
+        def task(runner: DBMigrationRunner):
+            if refresh:
+                runner.reset_migration_files()
+
+            runner.migrate(
+                is_drop=is_drop,
+                from_version=from_version,
+                to_version=to_version,
+            )
+
+            return runner.migration_meta.check_migration_version()
+
+        return self._submit(name, task).result()
+
+    def status(self, name: str) -> Optional[int]:
+        # status is not queued, probe uses own connection and does not touch runner state
+        return get_target(name, self._parser).get_probe().read_version()
+
+    def reload(self):
+        self.logger.info(f"Reloading config and dropping runners")
+        parser = read_config()
+
+        with self._lock:
+            self._parser = parser
+            runners = self._runners
+            self._runners = {}
+            self._etags = {}
+            self._revisions = {}
+
+            # disposing after already queued tasks of target, they still use old runner
+            for name, runner in runners.items():
+                self._queues[name].submit(runner.dispose)
+
+    def shutdown(self):
+        with self._lock:
+            queues = list(self._queues.values())
+            self._queues = {}
+
+        for queue in queues:
+            queue.shutdown(wait=True)
+
+        with self._lock:
+            runners = self._runners
+            self._runners = {}
+
+        for runner in runners.values():
+            runner.dispose()
@@ -1,15 +1,24 @@
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
 from enum import Enum
 from functools import cached_property
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from retry import retry
 from sqlalchemy import Connection
 
+from migration_tool.db_types import DBType
+from migration_tool.dialects import DialectCapabilities, get_dialect
 from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.logger.utils import bind_log_context
+from migration_tool.migration_config import MigrationConfig
 from migration_tool.migration_files.file import MigrationFile
 from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.migration_files.directives import parse_directives
+from migration_tool.migration_files.validation import MigrationFilesValidator
 from migration_tool.migration_meta.base import MigrationMeta
+from migration_tool.timings import MigrationTiming, TimingStore
 
 
 class MigrationType(Enum):
@@ -21,6 +30,7 @@ ExecMigration = Tuple[int, MigrationType]
 
 
 class DBMigrationRunner(LoggerMixIn, ABC):
+    DB_TYPE: DBType
     RETRY_LOGGER = LoggerMixIn.init_logger(f"retry")
     MIN_MIGRATION_VERSION = 0
     DB_LEVEL_MIGRATIONS = [0]
@@ -28,6 +38,17 @@ class DBMigrationRunner(LoggerMixIn, ABC):
         (0, MigrationType.Down)
     ]
     shared_target_conn: Optional[Connection] = None
+    # when set, path ETA is logged before sync and durations are recorded after it
+    timing_store: Optional[TimingStore] = None
+    _config: MigrationConfig
+    # relation:lock mode pairs held by current migration, filled by dialects which can inspect own locks
+    _lock_footprint: List[str] = []
+    # session settings from '-- pmmt:' header of running migration
+    _directives: Dict[str, str] = {}
+
+    @property
+    def capabilities(self) -> DialectCapabilities:
+        return get_dialect(self.DB_TYPE).capabilities
 
     @property
     @abstractmethod
@@ -52,6 +73,35 @@ class DBMigrationRunner(LoggerMixIn, ABC):
             for file in files
         }
 
+    @contextmanager
+    def _migration_lock(self) -> Iterator[bool]:
+        """
+        Guard for path building and syncing against concurrent runs.
+        Returns:
+            waited (bool): True if another process held the lock and we had to wait for it.
+        """
+        yield False
+
+    @cached_property
+    def migration_timings(self) -> List[MigrationTiming]:
+        """
+        Durations of migrations executed by the last migrate call of this runner.
+        """
+        return []
+
+    def reset_migration_files(self):
+        """
+        Drop cached migration files, so they are loaded again on next access.
+        """
+        self.__dict__.pop('migration_files', None)
+        self.__dict__.pop('migration_files_map', None)
+
+    def dispose(self):
+        """
+        Close connections and connection pools of runner, runner should not be used afterwards.
+        """
+        pass
+
     @abstractmethod
     def _execute_db_manage_query(self, query: str):
         raise NotImplementedError()
@@ -74,30 +124,40 @@ class DBMigrationRunner(LoggerMixIn, ABC):
 
         self._execute_db_manage_query(init_migration.up_query)
 
-    def build_migration_path(
-            self,
-            is_drop: bool = False,
-            from_version: Optional[int] = None,
-            to_version: int = 0
-    ) -> List[ExecMigration]:
-        if from_version is not None and self.MIN_MIGRATION_VERSION > from_version:
+    @classmethod
+    def _check_path_args(cls, from_version: Optional[int], to_version: int):
+        if from_version is not None and cls.MIN_MIGRATION_VERSION > from_version:
             raise ValueError(
                 f"Passed {from_version=} is less "
-                f"than min acceptable version value: {self.MIN_MIGRATION_VERSION}"
+                f"than min acceptable version value: {cls.MIN_MIGRATION_VERSION}"
             )
-        if self.MIN_MIGRATION_VERSION > to_version:
+        if cls.MIN_MIGRATION_VERSION > to_version:
             raise ValueError(
                 f"Passed {to_version=} is less "
-                f"than min acceptable version value: {self.MIN_MIGRATION_VERSION}"
+                f"than min acceptable version value: {cls.MIN_MIGRATION_VERSION}"
             )
         if from_version is not None and to_version < from_version:
             raise ValueError(f"Passed incompatible values from {from_version=} and {to_version=}")
 
-        curr_version = self.migration_meta.check_migration_version()
-        self.logger.info(f"Curr db version: {curr_version}")
+    @classmethod
+    def plan_migration_path(
+            cls,
+            curr_version: Optional[int],
+            is_drop: bool = False,
+            from_version: Optional[int] = None,
+            to_version: int = 0
+    ) -> List[ExecMigration]:
+        """
+        Build migration path from already known current version, without any db connection.
+        Parameters:
+            curr_version (Optional[int]): current db version, None if db or its meta storage does not exist.
+        """
+        cls._check_path_args(from_version, to_version)
+        logger = cls.init_logger(cls.__module__)
+
         result = []
         if curr_version is None:    # if db not exists and we need just create it
-            versions = list(range(self.MIN_MIGRATION_VERSION, to_version + 1))
+            versions = list(range(cls.MIN_MIGRATION_VERSION, to_version + 1))
             result = [
                 (
                     version,
@@ -106,7 +166,7 @@ class DBMigrationRunner(LoggerMixIn, ABC):
                 for version in versions
             ]
         elif is_drop:
-            versions = list(range(self.MIN_MIGRATION_VERSION, to_version + 1))
+            versions = list(range(cls.MIN_MIGRATION_VERSION, to_version + 1))
             result = [
                 (
                     version,
@@ -162,28 +222,139 @@ class DBMigrationRunner(LoggerMixIn, ABC):
 
             result = down_migrations + up_migrations
         else:
-            self.logger.error(f"Reached unhandled if for: {is_drop=}; {from_version=}; {to_version=}")
+            logger.error(f"Reached unhandled if for: {is_drop=}; {from_version=}; {to_version=}")
 
-        self.logger.info(f"Generate migration path: {result}")
+        logger.info(f"Generate migration path: {result}")
         return result
 
-    def _update_version_for_migration(self, migration: ExecMigration):
+    def build_migration_path(
+            self,
+            is_drop: bool = False,
+            from_version: Optional[int] = None,
+            to_version: int = 0
+    ) -> List[ExecMigration]:
+        self._check_path_args(from_version, to_version)
+
+        curr_version = self.migration_meta.check_migration_version()
+        self.logger.info(f"Curr db version: {curr_version}")
+
+        return self.plan_migration_path(
+            curr_version,
+            is_drop=is_drop,
+            from_version=from_version,
+            to_version=to_version,
+        )
+
+    def _get_meta_version(self, migration: ExecMigration) -> Optional[int]:
         if migration in self.NOT_TRACK_IN_META:
             self.logger.info(f"Received trackable migration: {migration}")
-            return
+            return None
 
         version = migration[0]
 
         if migration[1] == MigrationType.Down:
             version -= 1
 
+        return version
+
+    def _update_version_for_migration(self, migration: ExecMigration):
+        version = self._get_meta_version(migration)
+        if version is None:
+            return
+
         self.migration_meta.update_migration_version(version, self.shared_target_conn)
 
+    def _sync_migration(self, migration: ExecMigration):
+        migration_version = migration[0]
+        migration_type = migration[1]
+
+        migration_file = self.migration_files_map[migration_version]
+
+        self.logger.info(f"Run {migration_type.value} from {migration_version}_{migration_file.name}")
+
+        migration_script = (
+            migration_file.up_query
+            if migration_type == MigrationType.Up
+            else migration_file.down_query
+        )
+
+        self._lock_footprint = []
+        self._directives = parse_directives(migration_script)
+        if len(self._directives) > 0:
+            if not self.capabilities.session_directives or migration_version in self.DB_LEVEL_MIGRATIONS:
+                raise ValueError(f"Directives {self._directives} can't be applied to migration {migration}")
+            self.logger.info(f"Migration directives: {self._directives}")
+
+        start = time.perf_counter()
+
+        if migration_version in self.DB_LEVEL_MIGRATIONS:
+            self._execute_db_manage_query(migration_script)
+            self._update_version_for_migration(migration)
+        else:
+            self._execute_migration_query(migration, migration_script)
+
+        timing = MigrationTiming(
+            version=migration_version,
+            direction=migration_type.value,
+            name=migration_file.name,
+            duration=time.perf_counter() - start,
+            locks=self._lock_footprint,
+            directives=self._directives,
+        )
+        self.migration_timings.append(timing)
+        self.logger.info(
+            f"Migration done in {timing.duration:.3f}s, locks: {timing.locks}, directives: {timing.directives}"
+        )
+
+    def get_validator(self, workers: Optional[int] = None) -> MigrationFilesValidator:
+        return MigrationFilesValidator(
+            sql_parser=get_dialect(self.DB_TYPE).sql_parser,
+            workers=workers,
+            allow_directives=self.capabilities.session_directives,
+        )
+
+    def validate_migration_path(self, migration_path: List[ExecMigration]):
+        """
+        Check migration files of the whole path before any of them is executed.
+        Raises:
+            ValueError: if any path step has missing or incorrect script.
+        """
+        issues = self.get_validator().validate_path(
+            self.migration_files_map,
+            [(version, migration_type.value) for version, migration_type in migration_path],
+        )
+
+        if len(issues) > 0:
+            for issue in issues:
+                self.logger.error(f"Migration validation issue: {issue}")
+            raise ValueError(f"Migration path validation failed with {len(issues)} issues")
+
+        self.logger.info(f"Migration path validated: {len(migration_path)}")
+
+    def _log_estimate(self, migration_path: List[ExecMigration]):
+        if self.timing_store is None or len(migration_path) == 0:
+            return
+
+        duration, known = self.timing_store.estimate(
+            self._config.target_id,
+            [(version, migration_type.value) for version, migration_type in migration_path],
+        )
+        self.logger.info(
+            f"Estimated path duration: {duration:.1f}s "
+            f"by history of {known} from {len(migration_path)} migrations"
+        )
+
+    def _wait_between_migrations(self):
+        """
+        Hook for throttling path execution, called before every migration except the first one.
+        """
+        pass
+
     # @retry(tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
     def sync(self, migration_path: List[ExecMigration]):
         self.logger.info(f"Start db sync with path: {len(migration_path)}")
 
-        for migration in migration_path:
+        for i, migration in enumerate(migration_path):
             migration_version = migration[0]
             migration_type = migration[1]
 
@@ -192,19 +363,51 @@ class DBMigrationRunner(LoggerMixIn, ABC):
                 self.logger.warning(f"Stop migration syncing.")
                 return
 
-            migration_file = self.migration_files_map[migration_version]
+            with bind_log_context(version=migration_version, direction=migration_type.value):
+                if i > 0:
+                    self._wait_between_migrations()
+                self._sync_migration(migration)
 
-            self.logger.info(f"Run {migration_type.value} from {migration_version}_{migration_file.name}")
+    def migrate(
+            self,
+            is_drop: bool = False,
+            from_version: Optional[int] = None,
+            to_version: int = 0
+    ):
+        # runner is reused by daemon, only timings of this call are recorded
+        self.migration_timings.clear()
+
+        if not self.capabilities.transactional_ddl:
+            self.logger.warning(
+                f"DDL is not transactional for {self.DB_TYPE.value}, "
+                f"failed migration may leave partially applied changes"
+            )
 
-            migration_script = (
-                migration_file.up_query
-                if migration_type == MigrationType.Up
-                else migration_file.down_query
+        if self.capabilities.advisory_locks:
+            migration_lock = self._migration_lock()
+        else:
+            self.logger.warning(f"Concurrent runs are not serialized for {self.DB_TYPE.value}")
+            migration_lock = nullcontext(False)
+
+        with migration_lock as waited:
+            # explicit drop or start version runs are not skipped, they are expected to run from given state
+            if waited and not is_drop and from_version is None:
+                curr_version = self.migration_meta.check_migration_version()
+                if curr_version == to_version:
+                    self.logger.info(f"Target version {to_version} already reached by another process")
+                    return
+
+            migration_path = self.build_migration_path(
+                is_drop=is_drop,
+                from_version=from_version,
+                to_version=to_version,
             )
 
-            if migration_version in self.DB_LEVEL_MIGRATIONS:
-                self._execute_db_manage_query(migration_script)
-                self._update_version_for_migration(migration)
-                continue
+            self.validate_migration_path(migration_path)
+            self._log_estimate(migration_path)
 
-            self._execute_migration_query(migration, migration_script)
+            try:
+                self.sync(migration_path)
+            finally:
+                if self.timing_store is not None:
+                    self.timing_store.record(self._config.target_id, self.migration_timings)
@@ -0,0 +1,194 @@
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from pymysql.constants import CLIENT, CR, ER
+from pymysql.err import OperationalError as DriverOperationalError
+from retry import retry
+from sqlalchemy import create_engine, text, Connection
+from sqlalchemy.exc import OperationalError
+
+from migration_tool.db_migration.base import DBMigrationRunner, ExecMigration
+from migration_tool.db_types import DBType
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.migration_meta.mysql import MySQLMigrationMeta
+
+APP_NAME = 'migration-tool'
+
+
+class MySQLRetryableError(DriverOperationalError):
+    """
+    Lock contention or lost connection, pymysql raises OperationalError for most server errors,
+    so only these codes are retried.
+    """
+    ERROR_CODES = {
+        ER.LOCK_WAIT_TIMEOUT, ER.LOCK_DEADLOCK, ER.CON_COUNT_ERROR,
+        CR.CR_CONN_HOST_ERROR, CR.CR_SERVER_GONE_ERROR, CR.CR_SERVER_LOST,
+    }
+
+    @classmethod
+    def check(cls, e: Exception):
+        # sqlalchemy wraps driver errors raised on connect
+        error = e.orig if isinstance(e, OperationalError) else e
+        if isinstance(error, DriverOperationalError) and error.args[0] in cls.ERROR_CODES:
+            raise cls(*error.args) from e
+
+
+class MySQLMigrationRunner(DBMigrationRunner):
+    """
+    Runner for mysql/mariadb. Scripts are sent with multi statements client flag
+    in a single call. DDL causes implicit commit in mysql, so migration scripts are not retried.
+    """
+    DB_TYPE = DBType.Mysql
+    RETRY_LOGGER = LoggerMixIn.init_logger(f"retry")
+    TRY_LOCK_SCRIPT = 'SELECT GET_LOCK(:lock_name, 0)'
+    LOCK_SCRIPT = 'SELECT GET_LOCK(:lock_name, :timeout)'
+    UNLOCK_SCRIPT = 'SELECT RELEASE_LOCK(:lock_name)'
+
+    def __init__(self, config: MigrationConfig, files_loader: MigrationFilesLoader):
+        if config.db_type != self.DB_TYPE:
+            raise ValueError("Given not match config for mysql migration env")
+
+        self._config = config
+        self._files_loader = files_loader
+
+        connect_args = {
+            "client_flag": CLIENT.MULTI_STATEMENTS,
+            "program_name": APP_NAME,
+        }
+        self.target_engine = create_engine(
+            self.target_uri,
+            connect_args=connect_args,
+            # echo=True,
+            pool_recycle=30,
+            pool_pre_ping=True,
+        )
+        self.default_engine = create_engine(
+            self.default_uri,
+            connect_args=connect_args,
+            isolation_level="AUTOCOMMIT",
+            # echo=True,
+            pool_recycle=30,
+            pool_pre_ping=True,
+        )
+
+        self._migration_meta = MySQLMigrationMeta(
+            target_engine=self.target_engine,
+        )
+        self._target_conn: Optional[Connection] = None
+
+    @property
+    def target_conn(self):
+        if self._target_conn is None or self._target_conn.closed:
+            self._target_conn = self.target_engine.connect()
+
+        self.shared_target_conn = self._target_conn
+        return self._target_conn
+
+    @property
+    def target_uri(self):
+        return (
+            f"mysql+pymysql://"
+            f"{self._config.db_user}:{self._config.db_pass}@"
+            f"{self._config.db_host}:{self._config.db_port}/{self._config.db_name}"
+        )
+
+    @property
+    def default_uri(self):
+        return (
+            f"mysql+pymysql://"
+            f"{self._config.db_user}:{self._config.db_pass}@"
+            f"{self._config.db_host}:{self._config.db_port}/"
+        )
+
+    @property
+    def migration_files_loader(self) -> MigrationFilesLoader:
+        return self._files_loader
+
+    @property
+    def migration_meta(self) -> MySQLMigrationMeta:
+        return self._migration_meta
+
+    def dispose(self):
+        if self._target_conn is not None:
+            self._target_conn.close()
+        self.migration_meta.close()
+        self.target_engine.dispose()
+        self.default_engine.dispose()
+
+    @contextmanager
+    def _migration_lock(self) -> Iterator[bool]:
+        # mysql lock names are limited to 64 chars
+        lock_params = {
+            'lock_name': f"{APP_NAME}:{self._config.db_name}"[:64],
+        }
+
+        with self.default_engine.connect() as conn:
+            waited = False
+            if not conn.execute(text(self.TRY_LOCK_SCRIPT), lock_params).scalar():
+                waited = True
+                self.logger.info(
+                    f"Migration lock for {self._config.db_name} is held by another process, "
+                    f"waiting up to {self._config.lock_timeout}s"
+                )
+                if not conn.execute(
+                        text(self.LOCK_SCRIPT),
+                        {**lock_params, 'timeout': self._config.lock_timeout},
+                ).scalar():
+                    raise TimeoutError(
+                        f"Can't acquire migration lock for {self._config.db_name} "
+                        f"in {self._config.lock_timeout}s"
+                    )
+
+            self.logger.info(f"Migration lock acquired for {self._config.db_name}")
+            try:
+                yield waited
+            finally:
+                conn.execute(text(self.UNLOCK_SCRIPT), lock_params)
+                self.logger.info(f"Migration lock released for {self._config.db_name}")
+
+    def _execute_script(self, raw_conn, script: str):
+        with raw_conn.cursor() as cursor:
+            cursor.execute(script)
+            # all result sets have to be read before next command on the connection
+            while cursor.nextset():
+                pass
+
+    @retry(exceptions=MySQLRetryableError, tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
+    def _execute_db_manage_query(self, query: str):
+        try:
+            raw_conn = self.default_engine.raw_connection()
+        except OperationalError as e:
+            MySQLRetryableError.check(e)
+            raise
+
+        try:
+            self._execute_script(raw_conn, query)
+        except DriverOperationalError as e:
+            MySQLRetryableError.check(e)
+            raise
+        finally:
+            raw_conn.close()
+
+    def _execute_migration_query(self, migration: ExecMigration, query: str):
+        version = self._get_meta_version(migration)
+
+        raw_conn = self.target_engine.raw_connection()
+        try:
+            self._execute_script(raw_conn, query)
+            if version is not None:
+                self._execute_script(raw_conn, self.migration_meta.get_update_version_script(version))
+            raw_conn.commit()
+        except Exception as e:
+            raw_conn.rollback()
+            self.logger.error(
+                f"Received error on migration execute: {e}. "
+                f"Statements before implicit commits of the script are kept in db."
+            )
+            raise
+        finally:
+            raw_conn.close()
+
+        if version is not None:
+            self.logger.info(f"Meta version updated to: {version}")
@@ -1,24 +1,74 @@
-from typing import Optional
+import time
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Dict, Iterator, Optional, Set, List
 
 from retry import retry
-from sqlalchemy import create_engine, text, Connection
+from sqlalchemy import create_engine, text, Connection, Engine
+from sqlalchemy.exc import OperationalError
 
 from migration_tool.db_migration.base import DBMigrationRunner, ExecMigration
 from migration_tool.db_types import DBType
 from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.dialects import get_dialect
 from migration_tool.migration_config import MigrationConfig
 from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.migration_files.relations import extract_relation_locks, LOCK_CONFLICTS
 from migration_tool.migration_meta.postgresql import PostgreSQLMigrationMeta
 
 APP_NAME = 'migration-tool'
 
 
 class PostgreSQLMigrationRunner(DBMigrationRunner):
+    DB_TYPE = DBType.Postgresql
     DEFAULT_DB_NAME = 'postgres'
     RETRY_LOGGER = LoggerMixIn.init_logger(f"retry")
+    TRY_LOCK_SCRIPT = 'SELECT pg_try_advisory_lock(hashtext(:namespace), hashtext(:db_name))'
+    LOCK_SCRIPT = 'SELECT pg_advisory_lock(hashtext(:namespace), hashtext(:db_name))'
+    UNLOCK_SCRIPT = 'SELECT pg_advisory_unlock(hashtext(:namespace), hashtext(:db_name))'
+    SET_LOCK_TIMEOUT_SCRIPT = "SELECT set_config('lock_timeout', :timeout, false)"
+    RESET_LOCK_TIMEOUT_SCRIPT = 'RESET lock_timeout'
+    SET_LOCAL_LOCK_TIMEOUT_SCRIPT = "SELECT set_config('lock_timeout', :timeout, true)"
+    SET_LOCAL_SCRIPT = 'SELECT set_config(:name, :value, true)'
+    BLOCKERS_SCRIPT = '''
+        SELECT DISTINCT
+            a.pid,
+            a.state,
+            a.backend_type,
+            EXTRACT(EPOCH FROM now() - a.state_change) AS state_seconds,
+            l.mode,
+            r.name AS relation
+        FROM unnest(CAST(:relations AS text[])) r(name)
+        JOIN pg_locks l ON l.relation = to_regclass(r.name)
+        JOIN pg_stat_activity a ON a.pid = l.pid
+        WHERE l.granted
+            AND l.pid <> pg_backend_pid()
+            AND l.database = (SELECT oid FROM pg_database WHERE datname = current_database())
+    '''
+    TERMINATE_SCRIPT = 'SELECT pg_terminate_backend(:pid)'
+    OWN_LOCKS_SCRIPT = '''
+        SELECT DISTINCT
+            l.relation::regclass::text AS relation,
+            l.mode
+        FROM pg_locks l
+        JOIN pg_class c ON c.oid = l.relation
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE l.pid = pg_backend_pid()
+            AND l.granted
+            AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+            AND n.nspname NOT LIKE 'pg_toast%'
+        ORDER BY 1, 2
+    '''
+    CURRENT_WAL_LSN_SCRIPT = 'SELECT pg_current_wal_lsn()'
+    REPLAY_LAG_SCRIPT = 'SELECT pg_wal_lsn_diff(CAST(:lsn AS pg_lsn), pg_last_wal_replay_lsn())'
+    BLOCKER_POLL_INTERVAL = 1
+    REPLICA_POLL_INTERVAL = 1
+    BLOCKER_POLICY_WAIT = 'wait'
+    BLOCKER_POLICY_TERMINATE_IDLE = 'terminate_idle'
+    IDLE_IN_TRANSACTION_STATES = ('idle in transaction', 'idle in transaction (aborted)')
 
     def __init__(self, config: MigrationConfig, files_loader: MigrationFilesLoader):
-        if config.db_type != DBType.Postgresql:
+        if config.db_type != self.DB_TYPE:
             raise ValueError("Given not match config for postgresql migration env")
 
         self._config = config
@@ -53,21 +103,34 @@ class PostgreSQLMigrationRunner(DBMigrationRunner):
         self.shared_target_conn = self._target_conn
         return self._target_conn
 
-    @property
-    def target_uri(self):
+    @staticmethod
+    def build_uri(config: MigrationConfig, db_name: str):
         return (
             f"postgresql+psycopg2://"
-            f"{self._config.db_user}:{self._config.db_pass}@"
-            f"{self._config.db_host}:{self._config.db_port}/{self._config.db_name}"
+            f"{config.db_user}:{config.db_pass}@"
+            f"{config.db_host}:{config.db_port}/{db_name}"
         )
 
+    @property
+    def target_uri(self):
+        return self.build_uri(self._config, self._config.db_name)
+
     @property
     def default_uri(self):
-        return (
-            f"postgresql+psycopg2://"
-            f"{self._config.db_user}:{self._config.db_pass}@"
-            f"{self._config.db_host}:{self._config.db_port}/{self.DEFAULT_DB_NAME}"
-        )
+        return self.build_uri(self._config, self.DEFAULT_DB_NAME)
+
+    @cached_property
+    def replica_engines(self) -> Dict[str, Engine]:
+        return {
+            f"{config.db_host}:{config.db_port}": create_engine(
+                self.build_uri(config, config.db_name),
+                connect_args={"application_name": APP_NAME},
+                isolation_level="AUTOCOMMIT",
+                pool_recycle=30,
+                pool_pre_ping=True,
+            )
+            for config in self._config.get_replica_configs()
+        }
 
     @property
     def migration_files_loader(self) -> MigrationFilesLoader:
@@ -77,7 +140,52 @@ class PostgreSQLMigrationRunner(DBMigrationRunner):
     def migration_meta(self) -> PostgreSQLMigrationMeta:
         return self._migration_meta
 
-    @retry(tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
+    def dispose(self):
+        if self._target_conn is not None:
+            self._target_conn.close()
+        self.migration_meta.close()
+        self.target_engine.dispose()
+        self.default_engine.dispose()
+        # replica engines are created only on first use
+        for engine in self.__dict__.get('replica_engines', {}).values():
+            engine.dispose()
+
+    @contextmanager
+    def _migration_lock(self) -> Iterator[bool]:
+        # lock is taken in the default db, so it also covers runs that have to create the target db
+        lock_params = {
+            'namespace': APP_NAME,
+            'db_name': self._config.db_name,
+        }
+
+        with self.default_engine.connect() as conn:
+            waited = False
+            if not conn.execute(text(self.TRY_LOCK_SCRIPT), lock_params).scalar():
+                waited = True
+                self.logger.info(
+                    f"Migration lock for {self._config.db_name} is held by another process, "
+                    f"waiting up to {self._config.lock_timeout}s"
+                )
+                conn.execute(text(self.SET_LOCK_TIMEOUT_SCRIPT), {'timeout': f"{self._config.lock_timeout}s"})
+                try:
+                    conn.execute(text(self.LOCK_SCRIPT), lock_params)
+                except OperationalError as e:
+                    raise TimeoutError(
+                        f"Can't acquire migration lock for {self._config.db_name} "
+                        f"in {self._config.lock_timeout}s"
+                    ) from e
+                finally:
+                    conn.execute(text(self.RESET_LOCK_TIMEOUT_SCRIPT))
+
+            self.logger.info(f"Migration lock acquired for {self._config.db_name}")
+            try:
+                yield waited
+            finally:
+                conn.execute(text(self.UNLOCK_SCRIPT), lock_params)
+                self.logger.info(f"Migration lock released for {self._config.db_name}")
+
+    # only connection and lock problems are retried, errors in scripts fail at once
+    @retry(exceptions=OperationalError, tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
     def _execute_db_manage_query(self, query: str):
         default_conn = self.default_engine.connect()
         sql = text(query)
@@ -87,13 +195,145 @@ class PostgreSQLMigrationRunner(DBMigrationRunner):
 
         default_conn.close()
 
-    @retry(tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
+    def _terminate_idle_blockers(self, conn: Connection, blockers: List) -> int:
+        terminated = 0
+        for blocker in blockers:
+            if (
+                    blocker.state not in self.IDLE_IN_TRANSACTION_STATES
+                    or blocker.state_seconds < self._config.idle_terminate_after
+            ):
+                continue
+
+            self.logger.warning(
+                f"Terminating idle in transaction session {blocker.pid} "
+                f"holding {blocker.mode} on {blocker.relation} for {blocker.state_seconds:.0f}s"
+            )
+            conn.execute(text(self.TERMINATE_SCRIPT), {'pid': blocker.pid})
+            terminated += 1
+
+        return terminated
+
+    @classmethod
+    def _conflicting_blockers(cls, blockers: List, relation_locks: Dict[str, Set[str]]) -> List:
+        return [
+            blocker for blocker in blockers
+            if any(blocker.mode in LOCK_CONFLICTS[mode] for mode in relation_locks[blocker.relation])
+        ]
+
+    def _wait_for_quiet_window(self, relation_locks: Dict[str, Set[str]]):
+        """
+        Wait until no other session holds locks conflicting with locks migration takes on its relations,
+        so DDL does not queue behind them and block application queries behind itself.
+        """
+        if len(relation_locks) == 0:
+            return
+        relations = sorted(relation_locks)
+
+        deadline = time.monotonic() + self._config.blocker_wait_budget
+        with self.target_engine.connect() as conn:
+            while True:
+                blockers = self._conflicting_blockers(
+                    conn.execute(text(self.BLOCKERS_SCRIPT), {'relations': relations}).fetchall(),
+                    relation_locks,
+                )
+                # not keeping snapshot open between polls
+                conn.rollback()
+
+                if len(blockers) == 0:
+                    return
+
+                if self._config.blocker_policy == self.BLOCKER_POLICY_TERMINATE_IDLE:
+                    if self._terminate_idle_blockers(conn, blockers) > 0:
+                        conn.commit()
+                        continue
+
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(
+                        f"Relations {relations} are still locked by sessions "
+                        f"{sorted({blocker.pid for blocker in blockers})} "
+                        f"after {self._config.blocker_wait_budget}s"
+                    )
+
+                self.logger.info(
+                    f"Waiting for lock holders: "
+                    f"{[(blocker.pid, blocker.backend_type, blocker.mode, blocker.relation) for blocker in blockers]}"
+                )
+                time.sleep(self.BLOCKER_POLL_INTERVAL)
+
+    def _read_replica_lags(self, primary_lsn: str) -> Dict[str, Optional[float]]:
+        lags = {}
+        for replica, engine in self.replica_engines.items():
+            try:
+                with engine.connect() as conn:
+                    lag = conn.execute(text(self.REPLAY_LAG_SCRIPT), {'lsn': primary_lsn}).scalar()
+            except OperationalError as e:
+                self.logger.warning(f"Replica {replica} is not reachable: {e}")
+                lag = None
+
+            if lag is None:
+                self.logger.warning(f"Replay position of replica {replica} is unknown")
+            lags[replica] = lag
+
+        return lags
+
+    def _wait_between_migrations(self):
+        """
+        Wait until replicas replay WAL written by previous migrations,
+        so heavy DDL path does not leave standbys serving stale reads.
+        """
+        if self._config.max_replica_lag is None or len(self.replica_engines) == 0:
+            return
+
+        with self.target_engine.connect() as conn:
+            primary_lsn = conn.execute(text(self.CURRENT_WAL_LSN_SCRIPT)).scalar()
+
+        deadline = time.monotonic() + self._config.replica_wait_budget
+        while True:
+            lagging = {
+                replica: lag
+                for replica, lag in self._read_replica_lags(primary_lsn).items()
+                if lag is None or lag > self._config.max_replica_lag
+            }
+
+            if len(lagging) == 0:
+                return
+
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"Replicas {sorted(lagging)} did not catch up to {primary_lsn} "
+                    f"after {self._config.replica_wait_budget}s"
+                )
+
+            self.logger.info(f"Waiting for replicas to catch up to {primary_lsn}, lag in bytes: {lagging}")
+            time.sleep(self.REPLICA_POLL_INTERVAL)
+
+    def _record_schema_fingerprint(self, migration: ExecMigration, conn: Connection):
+        version = self._get_meta_version(migration)
+        if version is None or not self._config.record_fingerprint:
+            return
+
+        self.migration_meta.record_schema_fingerprint(version, conn)
+
+    @retry(exceptions=OperationalError, tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
     def _execute_migration_query(self, migration: ExecMigration, query: str):
+        self._wait_for_quiet_window(extract_relation_locks(get_dialect(self.DB_TYPE).sql_parser, query))
+
         with self.target_conn as conn:
             try:
+                # short lock timeout, so DDL fails and is retried instead of blocking queries queued after it
+                conn.execute(text(self.SET_LOCAL_LOCK_TIMEOUT_SCRIPT), {'timeout': self._config.ddl_lock_timeout})
+                # migration directives are transaction local, shared connection settings are restored on commit
+                for name, value in self._directives.items():
+                    conn.execute(text(self.SET_LOCAL_SCRIPT), {'name': name, 'value': value})
                 sql = text(query)
                 conn.execute(sql)
+                # read before meta updates, so footprint has only locks of migration itself
+                self._lock_footprint = [
+                    f"{row.relation}:{row.mode}"
+                    for row in conn.execute(text(self.OWN_LOCKS_SCRIPT))
+                ]
                 self._update_version_for_migration(migration)
+                self._record_schema_fingerprint(migration, conn)
             except Exception as e:
                 conn.rollback()
                 self.logger.error(f"Received error on migration execute: {e}")
@@ -0,0 +1,118 @@
+import sqlite3
+from typing import Optional
+
+from retry import retry
+from sqlalchemy import create_engine, Connection
+
+from migration_tool.db_migration.base import DBMigrationRunner, ExecMigration
+from migration_tool.db_types import DBType
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.migration_meta.sqlite import SQLiteMigrationMeta
+
+
+class SQLiteBusyError(sqlite3.OperationalError):
+    """
+    Db file is locked by other connection, the only sqlite error worth retrying.
+    """
+
+    @classmethod
+    def check(cls, e: sqlite3.OperationalError):
+        if e.sqlite_errorcode & 0xff in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED):
+            raise cls(str(e)) from e
+
+
+class SQLiteMigrationRunner(DBMigrationRunner):
+    """
+    Runner for sqlite db file, target name is the path of db file.
+    Scripts are run through sqlite3 executescript, so whole migration with version
+    tracking is passed to sqlite in one call inside an explicit transaction.
+    """
+    DB_TYPE = DBType.Sqlite
+    RETRY_LOGGER = LoggerMixIn.init_logger(f"retry")
+
+    def __init__(self, config: MigrationConfig, files_loader: MigrationFilesLoader):
+        if config.db_type != self.DB_TYPE:
+            raise ValueError("Given not match config for sqlite migration env")
+
+        self._config = config
+        self._files_loader = files_loader
+
+        self.target_engine = create_engine(
+            self.target_uri,
+            # echo=True,
+        )
+
+        self._migration_meta = SQLiteMigrationMeta(
+            target_engine=self.target_engine,
+            db_path=self._config.db_name,
+        )
+        self._target_conn: Optional[Connection] = None
+
+    @property
+    def target_conn(self):
+        if self._target_conn is None or self._target_conn.closed:
+            self._target_conn = self.target_engine.connect()
+
+        self.shared_target_conn = self._target_conn
+        return self._target_conn
+
+    @property
+    def target_uri(self):
+        return f"sqlite:///{self._config.db_name}"
+
+    @property
+    def migration_files_loader(self) -> MigrationFilesLoader:
+        return self._files_loader
+
+    @property
+    def migration_meta(self) -> SQLiteMigrationMeta:
+        return self._migration_meta
+
+    def dispose(self):
+        if self._target_conn is not None:
+            self._target_conn.close()
+        self.migration_meta.close()
+        self.target_engine.dispose()
+
+    @retry(exceptions=SQLiteBusyError, tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
+    def _execute_db_manage_query(self, query: str):
+        # there is no server level for sqlite, db level scripts are run against db file itself
+        raw_conn = self.target_engine.raw_connection()
+        try:
+            raw_conn.driver_connection.executescript(query)
+        except sqlite3.OperationalError as e:
+            SQLiteBusyError.check(e)
+            raise
+        finally:
+            raw_conn.close()
+
+    @retry(exceptions=SQLiteBusyError, tries=3, delay=10, backoff=2, logger=RETRY_LOGGER)
+    def _execute_migration_query(self, migration: ExecMigration, query: str):
+        version = self._get_meta_version(migration)
+        script = [
+            'BEGIN;',
+            query,
+            ';',
+        ]
+        if version is not None:
+            script.append(self.migration_meta.get_update_version_script(version))
+        script.append('COMMIT;')
+
+        raw_conn = self.target_engine.raw_connection()
+        driver_conn = raw_conn.driver_connection
+        try:
+            driver_conn.executescript('\n'.join(script))
+        except Exception as e:
+            if driver_conn.in_transaction:
+                driver_conn.execute('ROLLBACK')
+            self.logger.error(f"Received error on migration execute: {e}")
+            if isinstance(e, sqlite3.OperationalError):
+                SQLiteBusyError.check(e)
+            raise
+        finally:
+            raw_conn.close()
+
+        if version is not None:
+            self.logger.info(f"Meta version updated to: {version}")
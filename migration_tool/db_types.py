@@ -3,3 +3,5 @@ from enum import Enum
 
 class DBType(Enum):
     Postgresql = 'psql'
+    Mysql = 'mysql'
+    Sqlite = 'sqlite'
@@ -0,0 +1,91 @@
+import dataclasses
+from importlib import import_module
+from typing import Dict, Optional, Type, TYPE_CHECKING
+
+from migration_tool.db_types import DBType
+
+if TYPE_CHECKING:
+    from migration_tool.db_migration.base import DBMigrationRunner
+    from migration_tool.version_probe.base import VersionProbe
+
+
+@dataclasses.dataclass(frozen=True)
+class DialectCapabilities:
+    # DDL is rolled back with the migration transaction on failure
+    transactional_ddl: bool
+    # concurrent runs are serialized with db side named locks
+    advisory_locks: bool
+    # '-- pmmt:' header directives are applied as transaction local session settings
+    session_directives: bool = False
+
+
+@dataclasses.dataclass(frozen=True)
+class Dialect:
+    """
+    Dialect description, runner and probe are given as 'module:ClassName'
+    and imported only on use, so drivers of unused dialects are never loaded.
+    """
+    db_type: DBType
+    runner: str
+    probe: str
+    capabilities: DialectCapabilities
+    # parser name for offline migration scripts validation
+    sql_parser: Optional[str] = None
+
+    @staticmethod
+    def _import(path: str):
+        module_name, class_name = path.split(':')
+        return getattr(import_module(module_name), class_name)
+
+    def get_runner_class(self) -> Type['DBMigrationRunner']:
+        return self._import(self.runner)
+
+    def get_probe_class(self) -> Type['VersionProbe']:
+        return self._import(self.probe)
+
+
+DIALECTS: Dict[DBType, Dialect] = {}
+
+
+def register_dialect(dialect: Dialect):
+    DIALECTS[dialect.db_type] = dialect
+
+
+def get_dialect(db_type: DBType) -> Dialect:
+    if db_type not in DIALECTS:
+        raise ValueError(
+            f"Given db type '{db_type.value}' not have registered dialect: {list(DIALECTS)}"
+        )
+
+    return DIALECTS[db_type]
+
+
+register_dialect(Dialect(
+    db_type=DBType.Postgresql,
+    runner='migration_tool.db_migration.postgresql:PostgreSQLMigrationRunner',
+    probe='migration_tool.version_probe.postgresql:PostgreSQLVersionProbe',
+    capabilities=DialectCapabilities(
+        transactional_ddl=True,
+        advisory_locks=True,
+        session_directives=True,
+    ),
+    sql_parser='postgresql',
+))
+register_dialect(Dialect(
+    db_type=DBType.Mysql,
+    runner='migration_tool.db_migration.mysql:MySQLMigrationRunner',
+    probe='migration_tool.version_probe.mysql:MySQLVersionProbe',
+    capabilities=DialectCapabilities(
+        transactional_ddl=False,
+        advisory_locks=True,
+    ),
+))
+register_dialect(Dialect(
+    db_type=DBType.Sqlite,
+    runner='migration_tool.db_migration.sqlite:SQLiteMigrationRunner',
+    probe='migration_tool.version_probe.sqlite:SQLiteVersionProbe',
+    capabilities=DialectCapabilities(
+        transactional_ddl=True,
+        advisory_locks=False,
+    ),
+))
@@ -1,10 +1,50 @@
+import atexit
+import copy
 import logging
 import logging.handlers
 import logging.config
 import json
 import os
 import datetime
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+from queue import SimpleQueue
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# per target fields (target id, version, direction) attached to every record of current context
+LOG_CONTEXT: ContextVar[Optional[Dict[str, Any]]] = ContextVar('pmmt_log_context', default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def bind_log_context(**fields):
+    """
+    Attach fields to all log records of current thread/task inside the block.
+    Parameters:
+        fields: context fields, e.g. target, version, direction.
+    """
+    current = LOG_CONTEXT.get()
+    token = LOG_CONTEXT.set({**current, **fields} if current is not None else fields)
+    try:
+        yield
+    finally:
+        LOG_CONTEXT.reset(token)
+
+
+def _dumps(message: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(message, default=str).decode()
+
+    return json.dumps(message, default=str)
 
 
 class JSONFormatter(logging.Formatter):
@@ -22,7 +62,7 @@ class JSONFormatter(logging.Formatter):
     # @override
     def format(self, record: logging.LogRecord) -> str:
         message = self._prepare_log_dict(record)
-        return json.dumps(message, default=str)
+        return _dumps(message)
 
     def _prepare_log_dict(self, record: logging.LogRecord):
         always_fields = {
@@ -45,24 +85,130 @@ class JSONFormatter(logging.Formatter):
         }
         message.update(always_fields)
 
+        context = getattr(record, 'pmmt_context', None)
+        if context is not None:
+            message.update(context)
+
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed is not None:
+            message['suppressed'] = suppressed
+
         return message
 
 
-def init_logger():
+class LogContextFilter(logging.Filter):
+    """
+    Stores reference to current log context on record, has to run on the caller thread.
+    """
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.pmmt_context = LOG_CONTEXT.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limits records from the same call site to `rate` records per `per` seconds.
+    Warnings and errors are never dropped. Count of dropped records is attached to the next passed one.
+    """
+    def __init__(self, rate: int = 50, per: float = 1.0):
+        super().__init__()
+        self._rate = rate
+        self._per = per
+        self._lock = threading.Lock()
+        # call site -> (window start, passed in window, suppressed)
+        self._windows: Dict[Tuple[str, int], Tuple[float, int, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+
+        with self._lock:
+            start, passed, suppressed = self._windows.get(key, (now, 0, 0))
+            if now - start >= self._per:
+                start, passed = now, 0
+
+            if passed >= self._rate:
+                self._windows[key] = (start, passed, suppressed + 1)
+                return False
+
+            self._windows[key] = (start, passed + 1, 0)
+
+        if suppressed > 0:
+            record.suppressed = suppressed
+
+        return True
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that only merges message args on the caller thread,
+    json formatting and I/O are done by listener handlers.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+
+def stop_logger():
+    """
+    Flush queued records and stop listener thread.
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def init_logger(log_to_stderr: bool = False):
     # might add log_dir: str = './debug'
     """
-    Initializing root logger with configs from file
+    Initializing root logger with configs from file.
+    Configured root handlers are moved behind a queue listener thread.
 
     Args:
-    None
+    log_to_stderr: write stream handlers to stderr, so stdout carries only command results
 
     Returns:
     None
     """
+    global _listener
+
     # creating directory for logs
     Path('.').mkdir(parents=True, exist_ok=True)
     config_path = os.path.join(os.path.dirname(__file__), 'config.json')
 
     with open(config_path, "r", encoding='utf8') as f:
         config = json.load(f)
+
+    if log_to_stderr:
+        for handler in config['handlers'].values():
+            if handler.get('stream') == 'ext://sys.stdout':
+                handler['stream'] = 'ext://sys.stderr'
+
+    stop_logger()
     logging.config.dictConfig(config)
+
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+
+    queue = SimpleQueue()
+    queue_handler = LazyQueueHandler(queue)
+    queue_handler.addFilter(LogContextFilter())
+    queue_handler.addFilter(RateLimitFilter(**config.get('rate_limit', {})))
+
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    _listener = logging.handlers.QueueListener(queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+atexit.register(stop_logger)
@@ -1,4 +1,5 @@
 import dataclasses
+from typing import List, Optional
 
 from migration_tool.db_types import DBType
 
@@ -7,7 +8,36 @@ from migration_tool.db_types import DBType
 class MigrationConfig:
     db_name: str
     db_type: DBType
-    db_user: str
-    db_pass: str
-    db_port: str
-    db_host: str
+    db_user: Optional[str]
+    db_pass: Optional[str]
+    db_port: Optional[str]
+    db_host: Optional[str]
+    target_id: Optional[str] = None
+    lock_timeout: int = 600
+    # seconds to wait for sessions holding locks on migration relations
+    blocker_wait_budget: int = 300
+    # 'wait' or 'terminate_idle' for terminating idle in transaction blockers
+    blocker_policy: str = 'wait'
+    idle_terminate_after: int = 30
+    ddl_lock_timeout: str = '5s'
+    # schema fingerprint for drift detection is computed in migration transaction, while its locks are still held,
+    # catalog scan makes blocking window of every migration longer on large schemas
+    record_fingerprint: bool = True
+    # read replica hosts as host or host:port, credentials are shared with primary
+    replicas: List[str] = dataclasses.field(default_factory=list)
+    # replay lag in bytes that replicas should catch up to before next migration, no gating if None
+    max_replica_lag: Optional[int] = None
+    replica_wait_budget: int = 600
+
+    def get_replica_configs(self) -> List['MigrationConfig']:
+        configs = []
+        for replica in self.replicas:
+            host, _, port = replica.partition(':')
+            configs.append(dataclasses.replace(
+                self,
+                db_host=host,
+                db_port=port if port != '' else self.db_port,
+                replicas=[],
+            ))
+
+        return configs
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from enum import Enum
+from pathlib import Path
+from typing import List, Optional, Dict, Any
+
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_files.file import MigrationFile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bundle layout (little endian):
+#   header: magic (4s) | format version (H) | codec (H) | index length (I)
+#   index: utf-8 json list of {version, name, up, down}, where up/down is [offset, sha256] or null
+#   bodies: length (I) | compressed body, offsets in index are relative to bodies start
+MAGIC = b'PMMB'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+BODY_LENGTH = struct.Struct('<I')
+
+
+class BundleCodec(Enum):
+    Zlib = 1
+    Zstd = 2
+
+
+def _compress(codec: BundleCodec, data: bytes) -> bytes:
+    if codec == BundleCodec.Zstd:
+        return zstandard.ZstdCompressor(level=19).compress(data)
+
+    return zlib.compress(data, level=9)
+
+
+def _decompress(codec: BundleCodec, data: bytes) -> bytes:
+    if codec == BundleCodec.Zstd:
+        if zstandard is None:
+            raise RuntimeError("Bundle is compressed with zstd, but package 'zstandard' is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    return zlib.decompress(data)
+
+
+def default_codec() -> BundleCodec:
+    return BundleCodec.Zstd if zstandard is not None else BundleCodec.Zlib
+
+
+def write_bundle(path: str, files: List[MigrationFile], codec: Optional[BundleCodec] = None):
+    """
+    Write parsed migration files into single bundle file.
+    Parameters:
+        path (str): bundle file path.
+        files (List[MigrationFile]): migration files for bundle.
+        codec (Optional[BundleCodec]): bodies compression, zstd if available by default.
+    """
+    codec = codec if codec is not None else default_codec()
+    index: List[Dict[str, Any]] = []
+    bodies = bytearray()
+
+    def add_body(query: Optional[str]):
+        if query is None:
+            return None
+
+        data = query.encode()
+        compressed = _compress(codec, data)
+        offset = len(bodies)
+        bodies.extend(BODY_LENGTH.pack(len(compressed)))
+        bodies.extend(compressed)
+
+        return [offset, hashlib.sha256(data).hexdigest()]
+
+    for file in sorted(files, key=lambda x: x.version):
+        index.append({
+            'version': file.version,
+            'name': file.name,
+            'up': add_body(file.up_query),
+            'down': add_body(file.down_query),
+        })
+
+    raw_index = json.dumps(index).encode()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, codec.value, len(raw_index)))
+        file.write(raw_index)
+        file.write(bodies)
+
+    os.replace(tmp_path, path)
+
+
+class MigrationBundle(LoggerMixIn):
+    """
+    Bundle reader, file is mapped into memory and each body is decompressed only on access.
+    """
+    UP = 'up'
+    DOWN = 'down'
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+
+        with open(self._path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, codec, index_length = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"File {self._path} is not a migration bundle")
+        if format_version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported bundle format version {format_version} in {self._path}")
+
+        self._codec = BundleCodec(codec)
+        index_start = HEADER.size
+        self._bodies_start = index_start + index_length
+        self._index: Dict[int, Dict[str, Any]] = {
+            entry['version']: entry
+            for entry in json.loads(self._mmap[index_start:self._bodies_start])
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._mmap.close()
+
+    @property
+    def versions(self) -> List[int]:
+        return sorted(self._index)
+
+    def read_body(self, version: int, migration_type: str) -> Optional[str]:
+        """
+        Read one migration body.
+        Parameters:
+            version (int): migration version.
+            migration_type (str): 'up' or 'down'.
+        Returns:
+            query (Optional[str]): migration script or None if bundle has no such body.
+        """
+        entry = self._index.get(version)
+        if entry is None or entry[migration_type] is None:
+            return None
+
+        offset, body_hash = entry[migration_type]
+        start = self._bodies_start + offset
+        (length,) = BODY_LENGTH.unpack_from(self._mmap, start)
+        start += BODY_LENGTH.size
+
+        data = _decompress(self._codec, self._mmap[start:start + length])
+        if hashlib.sha256(data).hexdigest() != body_hash:
+            raise ValueError(f"Hash mismatch for {version} {migration_type} body in bundle {self._path}")
+
+        return data.decode()
+
+    def load_files(self) -> List[MigrationFile]:
+        return [
+            MigrationFile(
+                version=version,
+                name=self._index[version]['name'],
+                up_query=self.read_body(version, self.UP),
+                down_query=self.read_body(version, self.DOWN),
+            )
+            for version in self.versions
+        ]
@@ -0,0 +1,43 @@
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_files.bundle import MigrationBundle, write_bundle
+from migration_tool.migration_files.file import MigrationFile
+
+
+class MigrationFilesCache(LoggerMixIn):
+    """
+    Local disk cache of parsed migration files, keyed by source revision.
+    Entries are stored as migration bundles.
+    """
+    KEY_REGEX = re.compile(r'[^A-Za-z0-9_.-]')
+
+    def __init__(self, cache_dir: str):
+        self._cache_dir = Path(cache_dir)
+
+    @classmethod
+    def make_key(cls, *parts: str) -> str:
+        return '_'.join(cls.KEY_REGEX.sub('-', part) for part in parts)
+
+    def _get_path(self, key: str) -> Path:
+        return self._cache_dir / f"{key}.pmmb"
+
+    def get(self, key: str) -> Optional[List[MigrationFile]]:
+        path = self._get_path(key)
+        if not path.exists():
+            self.logger.debug(f"Cache miss: {key}")
+            return None
+
+        with MigrationBundle(str(path)) as bundle:
+            result = bundle.load_files()
+
+        self.logger.debug(f"Cache hit: {key}")
+        return result
+
+    def put(self, key: str, files: List[MigrationFile]):
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        # bundle is written through atomic replace, so concurrent readers never see a partial entry
+        write_bundle(str(self._get_path(key)), files)
+        self.logger.debug(f"Cache stored: {key}")
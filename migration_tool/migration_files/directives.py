@@ -0,0 +1,55 @@
+import re
+from typing import Dict
+
+DIRECTIVE_REGEX = re.compile(r'^--\s*pmmt:(.*)$')
+MEMORY_VALUE_REGEX = re.compile(r'^\d+\s*(kB|MB|GB|TB)?$')
+COUNT_VALUE_REGEX = re.compile(r'^\d+$')
+DURATION_VALUE_REGEX = re.compile(r'^\d+\s*(us|ms|s|min|h|d)?$')
+# session settings which are safe to change for a single migration transaction
+ALLOWED_DIRECTIVES = {
+    'maintenance_work_mem': MEMORY_VALUE_REGEX,
+    'work_mem': MEMORY_VALUE_REGEX,
+    'max_parallel_maintenance_workers': COUNT_VALUE_REGEX,
+    'max_parallel_workers_per_gather': COUNT_VALUE_REGEX,
+    'statement_timeout': DURATION_VALUE_REGEX,
+    'lock_timeout': DURATION_VALUE_REGEX,
+}
+
+
+def parse_directives(script: str) -> Dict[str, str]:
+    """
+    Read '-- pmmt: name=value, ...' directives from comment header of migration script.
+    Header ends on the first line which is neither blank nor a comment.
+    Raises:
+        ValueError: on malformed directive, not allowed setting name or invalid value.
+    """
+    directives = {}
+
+    for line in script.splitlines():
+        line = line.strip()
+        if line == '':
+            continue
+        if not line.startswith('--'):
+            break
+
+        match = DIRECTIVE_REGEX.match(line)
+        if match is None:
+            continue
+
+        for item in match.group(1).split(','):
+            name, separator, value = item.partition('=')
+            name = name.strip()
+            value = value.strip()
+
+            if separator == '' or name == '' or value == '':
+                raise ValueError(f"malformed directive '{item.strip()}', expected name=value")
+            if name not in ALLOWED_DIRECTIVES:
+                raise ValueError(f"directive '{name}' is not allowed, allowed: {sorted(ALLOWED_DIRECTIVES)}")
+            if ALLOWED_DIRECTIVES[name].match(value) is None:
+                raise ValueError(f"invalid value '{value}' of directive '{name}'")
+            if name in directives:
+                raise ValueError(f"directive '{name}' is given more than once")
+
+            directives[name] = value
+
+    return directives
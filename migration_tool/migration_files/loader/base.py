@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 from migration_tool.logger.mix_in import LoggerMixIn
 from migration_tool.migration_files.file import MigrationFile
@@ -9,3 +9,40 @@ class MigrationFilesLoader(LoggerMixIn, ABC):
     @abstractmethod
     def load_files_list(self) -> List[MigrationFile]:
         raise NotImplementedError()
+
+    def load_revision_files(self, revision: str) -> List[MigrationFile]:
+        """
+        Load migration files of revision received from poll_revision, without checking current revision again.
+        """
+        return self.load_files_list()
+
+    def get_latest_version(self) -> Optional[int]:
+        """
+        Latest available migration version or None if source has no migrations.
+        """
+        files = self.load_files_list()
+
+        return max((file.version for file in files), default=None)
+
+    def dump_bundle(self, path: str):
+        """
+        Write loaded migration files into bundle file.
+        Parameters:
+            path (str): bundle file path.
+        """
+        from migration_tool.migration_files.bundle import write_bundle
+
+        files = self.load_files_list()
+        write_bundle(path, files)
+        self.logger.info(f"Bundle {path} written with migrations count: {len(files)}")
+
+    def poll_revision(self, etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Check current revision of migration files source.
+        Parameters:
+            etag (Optional[str]): etag from previous poll.
+        Returns:
+            revision (Optional[str]): current revision or None if it is not modified since previous poll.
+            etag (Optional[str]): etag for next poll.
+        """
+        raise NotImplementedError()
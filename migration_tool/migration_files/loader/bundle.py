@@ -0,0 +1,40 @@
+import dataclasses
+import os
+from typing import List, Optional, Tuple
+
+from migration_tool.migration_files.bundle import MigrationBundle
+from migration_tool.migration_files.file import MigrationFile
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+
+
+@dataclasses.dataclass
+class FromBundleMigrationFilesLoaderConfig:
+    bundle_path: str
+
+
+class FromBundleMigrationFilesLoader(MigrationFilesLoader):
+    def __init__(self, config: FromBundleMigrationFilesLoaderConfig):
+        self._config = config
+
+    def load_files_list(self) -> List[MigrationFile]:
+        self.logger.info(f"Reading migration bundle: {self._config.bundle_path}")
+        with MigrationBundle(self._config.bundle_path) as bundle:
+            result = bundle.load_files()
+
+        self.logger.info(f"Read migrations from bundle count: {len(result)}")
+        return result
+
+    def poll_revision(self, etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        # bundle is replaced as a whole file, so its stat identifies the revision
+        stat = os.stat(self._config.bundle_path)
+        revision = f"{stat.st_mtime_ns}-{stat.st_size}"
+
+        if revision == etag:
+            return None, etag
+
+        return revision, revision
+
+    def get_latest_version(self) -> Optional[int]:
+        # reading only bundle index without bodies decompression
+        with MigrationBundle(self._config.bundle_path) as bundle:
+            return max(bundle.versions, default=None)
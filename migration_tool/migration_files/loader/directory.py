@@ -0,0 +1,31 @@
+import dataclasses
+from pathlib import Path
+from typing import List
+
+from migration_tool.migration_files.file import MigrationFile
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.migration_files.loader.script_files import MigrationScriptFilesMixIn
+
+
+@dataclasses.dataclass
+class FromDirectoryMigrationFilesLoaderConfig:
+    migration_files_dir: str
+
+
+class FromDirectoryMigrationFilesLoader(MigrationScriptFilesMixIn, MigrationFilesLoader):
+    """
+    Loads migration scripts from local directory, e.g. from repository checkout in CI.
+    """
+
+    def __init__(self, config: FromDirectoryMigrationFilesLoaderConfig):
+        self._config = config
+
+    def load_files_list(self) -> List[MigrationFile]:
+        files_dir = Path(self._config.migration_files_dir)
+        if not files_dir.is_dir():
+            raise ValueError(f"Migration files directory not found: {files_dir}")
+
+        paths = sorted(path for path in files_dir.iterdir() if path.is_file())
+        self.logger.info(f"Read file from directory {files_dir} count: {len(paths)}")
+
+        return self._build_migration_files((path.name, path.read_bytes) for path in paths)
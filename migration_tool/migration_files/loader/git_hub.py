@@ -1,11 +1,13 @@
 import dataclasses
-import re
-from typing import List, Dict, Any
+from typing import List, Optional, Tuple
 
+import requests
 from github import Github
 from github.Auth import Token
 
+from migration_tool.migration_files.cache import MigrationFilesCache
 from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.migration_files.loader.script_files import MigrationScriptFilesMixIn
 from migration_tool.migration_files.file import MigrationFile
 
 
@@ -16,82 +18,80 @@ class FromGitHubRepoMigrationFilesLoaderConfig:
     repo_name: str
     migration_files_dir: str
     github_pat_value: str
+    cache_dir: Optional[str] = None
 
 
-class FromGitHubRepoMigrationFilesLoader(MigrationFilesLoader):
-    UP_MIGRATION_KEYWORD = 'up'
-    DOWN_MIGRATION_KEYWORD = 'down'
-    MIGRATION_FILE_REGEX = rf'^(\d+)_(.+)\.({UP_MIGRATION_KEYWORD}|{DOWN_MIGRATION_KEYWORD})\.(sql)$'
-    BEGIN_COMMAND = 'BEGIN;'
-    COMMIT_COMMAND = 'COMMIT;'
+class FromGitHubRepoMigrationFilesLoader(MigrationScriptFilesMixIn, MigrationFilesLoader):
+    API_URL = 'https://api.github.com'
+    REQUEST_TIMEOUT = 10
 
     def __init__(self, config: FromGitHubRepoMigrationFilesLoaderConfig):
         self._config = config
+        self._cache = MigrationFilesCache(config.cache_dir) if config.cache_dir is not None else None
+
+    def poll_revision(self, etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        headers = {
+            'Accept': 'application/vnd.github.sha',
+            'Authorization': f"Bearer {self._config.github_pat_value}",
+        }
+        if etag is not None:
+            # not modified responses are not counted in rate limit
+            headers['If-None-Match'] = etag
+
+        response = requests.get(
+            f"{self.API_URL}/repos/{self._config.repo_owner}/{self._config.repo_name}/commits/{self._config.branch}",
+            headers=headers,
+            timeout=self.REQUEST_TIMEOUT,
+        )
+
+        if response.status_code == requests.codes.not_modified:
+            return None, etag
+
+        response.raise_for_status()
+        return response.text.strip(), response.headers.get('ETag')
+
+    def _cache_key(self, revision: str) -> str:
+        return MigrationFilesCache.make_key(
+            self._config.repo_owner,
+            self._config.repo_name,
+            self._config.migration_files_dir,
+            revision,
+        )
 
-    @classmethod
-    def _prepare_migration_file(cls, file: bytes):
-        script = file.decode()
-        script = script.rstrip()
-        script = script.removeprefix(cls.BEGIN_COMMAND)
-        script = script.removesuffix(cls.COMMIT_COMMAND)
+    def load_files_list(self) -> List[MigrationFile]:
+        if self._cache is None:
+            return self._load_files_list(self._config.branch)
 
-        return script
+        revision, _ = self.poll_revision()
+        self.logger.info(f"Branch {self._config.branch} head: {revision}")
 
-    def load_files_list(self) -> List[MigrationFile]:
+        return self.load_revision_files(revision)
+
+    def load_revision_files(self, revision: str) -> List[MigrationFile]:
+        if self._cache is None:
+            return self._load_files_list(revision)
+
+        key = self._cache_key(revision)
+        result = self._cache.get(key)
+        if result is not None:
+            self.logger.info(f"Using cached migration files for revision: {revision}")
+            return result
+
+        result = self._load_files_list(revision)
+        self._cache.put(key, result)
+
+        return result
+
+    def _load_files_list(self, ref: str) -> List[MigrationFile]:
         self.logger.info(f"Connecting to git.hub repo: {self._config.repo_owner}/{self._config.repo_name}")
         with Github(auth=Token(self._config.github_pat_value)) as g:
             files = (
                 g.get_organization(self._config.repo_owner).
                 get_repo(self._config.repo_name).
-                get_contents(path=self._config.migration_files_dir, ref=self._config.branch)
+                get_contents(path=self._config.migration_files_dir, ref=ref)
             )
 
         self.logger.info(f"Read file from github {self._config.migration_files_dir} count: {len(files)}")
-        pattern = re.compile(self.MIGRATION_FILE_REGEX)
-
-        migrations_data: Dict[int, Dict[str, Any]] = {}
-        migration_names: Dict[int, str] = {}
-
-        for file in files:
-            match_result = pattern.match(file.name)
-            if match_result is None:
-                continue
 
-            migration_version = int(match_result.group(1))
-            migration_name = match_result.group(2)
-            migration_data = file.decoded_content
-            migration_type = match_result.group(3)
-
-            if migration_version not in migration_names:
-                migration_names[migration_version] = migration_name
-                migrations_data[migration_version] = {}
-
-            if migration_type in migrations_data[migration_version]:
-                raise ValueError(
-                    f"In migration for version: {migration_version} type: {migration_type} detected multiple files"
-                )
-
-            migrations_data[migration_version][migration_type] = self._prepare_migration_file(migration_data)
-
-        result = []
-        for version, name in migration_names.items():
-            migration_data = migrations_data.get(version)
-            if migrations_data is None:
-                raise ValueError(f"No migration date for {version}_{name}")
-
-            up = migration_data.get(self.UP_MIGRATION_KEYWORD)
-            down = migration_data.get(self.DOWN_MIGRATION_KEYWORD)
-
-            if up is None:
-                raise ValueError(f"For migration file is required up migration existence")
-
-            result.append(MigrationFile(
-                version=version,
-                name=name,
-                up_query=up,
-                down_query=down,
-            ))
-
-        result = list(sorted(result, key=lambda x: x.version))
-        
-        return result
+        # content of github files is fetched lazily, only for migration scripts
+        return self._build_migration_files((file.name, lambda file=file: file.decoded_content) for file in files)
@@ -0,0 +1,81 @@
+import re
+from typing import List, Dict, Any, Iterable, Tuple, Callable
+
+from migration_tool.migration_files.file import MigrationFile
+
+
+class MigrationScriptFilesMixIn:
+    """
+    Builds migration files from '<version>_<name>.<up|down>.sql' scripts of a directory.
+    """
+    UP_MIGRATION_KEYWORD = 'up'
+    DOWN_MIGRATION_KEYWORD = 'down'
+    MIGRATION_FILE_REGEX = rf'^(\d+)_(.+)\.({UP_MIGRATION_KEYWORD}|{DOWN_MIGRATION_KEYWORD})\.(sql)$'
+    BEGIN_COMMAND = 'BEGIN;'
+    COMMIT_COMMAND = 'COMMIT;'
+
+    @classmethod
+    def _prepare_migration_file(cls, file: bytes):
+        script = file.decode()
+        script = script.rstrip()
+        script = script.removeprefix(cls.BEGIN_COMMAND)
+        script = script.removesuffix(cls.COMMIT_COMMAND)
+
+        return script
+
+    @classmethod
+    def _build_migration_files(cls, files: Iterable[Tuple[str, Callable[[], bytes]]]) -> List[MigrationFile]:
+        """
+        Parameters:
+            files (Iterable[Tuple[str, Callable[[], bytes]]]): file names with content readers,
+                content is read only for migration scripts.
+        Returns:
+            migration files sorted by version.
+        """
+        pattern = re.compile(cls.MIGRATION_FILE_REGEX)
+
+        migrations_data: Dict[int, Dict[str, Any]] = {}
+        migration_names: Dict[int, str] = {}
+
+        for file_name, read_content in files:
+            match_result = pattern.match(file_name)
+            if match_result is None:
+                continue
+
+            migration_version = int(match_result.group(1))
+            migration_name = match_result.group(2)
+            migration_type = match_result.group(3)
+
+            if migration_version not in migration_names:
+                migration_names[migration_version] = migration_name
+                migrations_data[migration_version] = {}
+
+            if migration_type in migrations_data[migration_version]:
+                raise ValueError(
+                    f"In migration for version: {migration_version} type: {migration_type} detected multiple files"
+                )
+
+            migrations_data[migration_version][migration_type] = cls._prepare_migration_file(read_content())
+
+        result = []
+        for version, name in migration_names.items():
+            migration_data = migrations_data.get(version)
+            if migrations_data is None:
+                raise ValueError(f"No migration date for {version}_{name}")
+
+            up = migration_data.get(cls.UP_MIGRATION_KEYWORD)
+            down = migration_data.get(cls.DOWN_MIGRATION_KEYWORD)
+
+            if up is None:
+                raise ValueError(f"For migration file is required up migration existence")
+
+            result.append(MigrationFile(
+                version=version,
+                name=name,
+                up_query=up,
+                down_query=down,
+            ))
+
+        result = list(sorted(result, key=lambda x: x.version))
+
+        return result
@@ -0,0 +1,198 @@
+import json
+import re
+from typing import Optional, Set, Any, Dict, Iterable
+
+from migration_tool.migration_files.validation import POSTGRESQL_PARSER, DOLLAR_QUOTED_REGEX, LINE_COMMENT_REGEX
+
+ACCESS_SHARE = 'AccessShareLock'
+ROW_SHARE = 'RowShareLock'
+ROW_EXCLUSIVE = 'RowExclusiveLock'
+SHARE_UPDATE_EXCLUSIVE = 'ShareUpdateExclusiveLock'
+SHARE = 'ShareLock'
+SHARE_ROW_EXCLUSIVE = 'ShareRowExclusiveLock'
+EXCLUSIVE = 'ExclusiveLock'
+ACCESS_EXCLUSIVE = 'AccessExclusiveLock'
+# table lock modes in pg_locks names, ordered by LockStmt mode numbers
+LOCK_MODES = [
+    ACCESS_SHARE, ROW_SHARE, ROW_EXCLUSIVE, SHARE_UPDATE_EXCLUSIVE,
+    SHARE, SHARE_ROW_EXCLUSIVE, EXCLUSIVE, ACCESS_EXCLUSIVE,
+]
+# held lock modes which conflict with requested mode
+LOCK_CONFLICTS = {
+    ACCESS_SHARE: {ACCESS_EXCLUSIVE},
+    ROW_SHARE: {EXCLUSIVE, ACCESS_EXCLUSIVE},
+    ROW_EXCLUSIVE: {SHARE, SHARE_ROW_EXCLUSIVE, EXCLUSIVE, ACCESS_EXCLUSIVE},
+    SHARE_UPDATE_EXCLUSIVE: {SHARE_UPDATE_EXCLUSIVE, SHARE, SHARE_ROW_EXCLUSIVE, EXCLUSIVE, ACCESS_EXCLUSIVE},
+    SHARE: {ROW_EXCLUSIVE, SHARE_UPDATE_EXCLUSIVE, SHARE_ROW_EXCLUSIVE, EXCLUSIVE, ACCESS_EXCLUSIVE},
+    SHARE_ROW_EXCLUSIVE: {
+        ROW_EXCLUSIVE, SHARE_UPDATE_EXCLUSIVE, SHARE, SHARE_ROW_EXCLUSIVE, EXCLUSIVE, ACCESS_EXCLUSIVE,
+    },
+    EXCLUSIVE: set(LOCK_MODES[1:]),
+    ACCESS_EXCLUSIVE: set(LOCK_MODES),
+}
+
+IDENTIFIER = r'(?:"(?:[^"]|"")+"|[\w$]+)'
+QUALIFIED_IDENTIFIER = rf'{IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}}'
+IDENTIFIER_LIST = rf'(?P<names>{QUALIFIED_IDENTIFIER}(?:\s*,\s*(?:ONLY\s+)?{QUALIFIED_IDENTIFIER})*)'
+RELATION_OBJECTS = r'(?:TABLE|INDEX|VIEW|MATERIALIZED\s+VIEW|SEQUENCE)'
+# (regex, lock mode), relation names are in group names, lock mode is lowered by optional concurrently group
+RELATION_REGEXES = [
+    (
+        re.compile(
+            rf'\bALTER\s+{RELATION_OBJECTS}\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(?P<names>{QUALIFIED_IDENTIFIER})',
+            re.IGNORECASE,
+        ),
+        ACCESS_EXCLUSIVE,
+    ),
+    (
+        re.compile(
+            rf'\bDROP\s+{RELATION_OBJECTS}\s+(?P<concurrently>CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?{IDENTIFIER_LIST}',
+            re.IGNORECASE,
+        ),
+        ACCESS_EXCLUSIVE,
+    ),
+    (
+        re.compile(rf'\bTRUNCATE\s+(?:TABLE\s+)?(?:ONLY\s+)?{IDENTIFIER_LIST}', re.IGNORECASE),
+        ACCESS_EXCLUSIVE,
+    ),
+    (
+        re.compile(
+            rf'\bCREATE\s+(?:UNIQUE\s+)?INDEX\s+(?P<concurrently>CONCURRENTLY\s+)?(?:IF\s+NOT\s+EXISTS\s+)?'
+            rf'(?:{IDENTIFIER}\s+)?ON\s+(?:ONLY\s+)?(?P<names>{QUALIFIED_IDENTIFIER})',
+            re.IGNORECASE,
+        ),
+        SHARE,
+    ),
+    (re.compile(rf'\bREFERENCES\s+(?P<names>{QUALIFIED_IDENTIFIER})', re.IGNORECASE), SHARE_ROW_EXCLUSIVE),
+    (
+        re.compile(
+            rf'\b(?:UPDATE|INSERT\s+INTO|DELETE\s+FROM)\s+(?:ONLY\s+)?(?P<names>{QUALIFIED_IDENTIFIER})',
+            re.IGNORECASE,
+        ),
+        ROW_EXCLUSIVE,
+    ),
+]
+LOCK_REGEX = re.compile(
+    rf'\bLOCK\s+(?:TABLE\s+)?(?:ONLY\s+)?{IDENTIFIER_LIST}(?:\s+IN\s+(?P<mode>[A-Z ]+?)\s+MODE)?',
+    re.IGNORECASE,
+)
+LIST_SEPARATOR_REGEX = re.compile(r'\s*,\s*(?:ONLY\s+)?', re.IGNORECASE)
+DOT_REGEX = re.compile(r'\s*\.\s*')
+# words matched by keywords positions of regexes, not relation names
+NOT_RELATIONS = {
+    'table', 'index', 'view', 'sequence', 'schema', 'function', 'procedure', 'type', 'if', 'only',
+    'set', 'cascade', 'restrict', 'of', 'nowait',
+}
+DROP_RELATION_TYPES = {'OBJECT_TABLE', 'OBJECT_INDEX', 'OBJECT_VIEW', 'OBJECT_MATVIEW', 'OBJECT_SEQUENCE'}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _add(result: Dict[str, Set[str]], relation: str, mode: str):
+    result.setdefault(relation, set()).add(mode)
+
+
+def _range_var_name(node: dict) -> str:
+    # range vars are wrapped into node type inside lists and bare in typed fields
+    node = node.get('RangeVar', node)
+    schema = node.get('schemaname')
+    name = _quote(node['relname'])
+
+    return f"{_quote(schema)}.{name}" if schema is not None else name
+
+
+def _add_range_vars(result: Dict[str, Set[str]], nodes: Iterable[dict], mode: str):
+    for node in nodes:
+        _add(result, _range_var_name(node), mode)
+
+
+def _collect_statement_locks(node_type: str, node: dict, result: Dict[str, Set[str]]):
+    if node_type in ('InsertStmt', 'UpdateStmt', 'DeleteStmt', 'MergeStmt'):
+        _add_range_vars(result, [node['relation']], ROW_EXCLUSIVE)
+    elif node_type in ('AlterTableStmt', 'RenameStmt') and 'relation' in node:
+        _add_range_vars(result, [node['relation']], ACCESS_EXCLUSIVE)
+    elif node_type in ('TruncateStmt', 'LockStmt'):
+        mode = LOCK_MODES[node.get('mode', len(LOCK_MODES)) - 1] if node_type == 'LockStmt' else ACCESS_EXCLUSIVE
+        _add_range_vars(result, node.get('relations', []), mode)
+    elif node_type == 'IndexStmt':
+        _add_range_vars(result, [node['relation']], SHARE_UPDATE_EXCLUSIVE if node.get('concurrent') else SHARE)
+    elif node_type == 'CreateTrigStmt':
+        _add_range_vars(result, [node['relation']], SHARE_ROW_EXCLUSIVE)
+    elif node_type == 'RefreshMatViewStmt':
+        _add_range_vars(result, [node['relation']], EXCLUSIVE if node.get('concurrent') else ACCESS_EXCLUSIVE)
+    elif node_type == 'Constraint' and node.get('contype') == 'CONSTR_FOREIGN':
+        # foreign key adds triggers to referenced table
+        _add_range_vars(result, [node['pktable']], SHARE_ROW_EXCLUSIVE)
+    elif node_type == 'DropStmt' and node.get('removeType') in DROP_RELATION_TYPES:
+        # drop statements keep names as string lists instead of range vars
+        mode = SHARE_UPDATE_EXCLUSIVE if node.get('concurrent') else ACCESS_EXCLUSIVE
+        for item in node.get('objects', []):
+            parts = [part['String']['sval'] for part in item.get('List', {}).get('items', []) if 'String' in part]
+            if len(parts) > 0:
+                _add(result, '.'.join(_quote(part) for part in parts), mode)
+
+
+def _collect_locks(node: Any, result: Dict[str, Set[str]]):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, dict):
+                _collect_statement_locks(key, value, result)
+            _collect_locks(value, result)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_locks(value, result)
+
+
+def _extract_with_postgresql_parser(script: str) -> Dict[str, Set[str]]:
+    from pglast.parser import parse_sql_json
+
+    result = {}
+    _collect_locks(json.loads(parse_sql_json(script)), result)
+
+    return result
+
+
+def _split_names(names: str) -> Iterable[str]:
+    for name in LIST_SEPARATOR_REGEX.split(names):
+        if name.lower() not in NOT_RELATIONS:
+            yield DOT_REGEX.sub('.', name)
+
+
+def _extract_with_regex(script: str) -> Dict[str, Set[str]]:
+    stripped = DOLLAR_QUOTED_REGEX.sub('', script)
+    stripped = LINE_COMMENT_REGEX.sub('', stripped)
+
+    result = {}
+    for regex, mode in RELATION_REGEXES:
+        for match in regex.finditer(stripped):
+            concurrently = 'concurrently' in regex.groupindex and match.group('concurrently') is not None
+            for name in _split_names(match.group('names')):
+                _add(result, name, SHARE_UPDATE_EXCLUSIVE if concurrently else mode)
+    for match in LOCK_REGEX.finditer(stripped):
+        mode_words = match.group('mode')
+        mode = ACCESS_EXCLUSIVE if mode_words is None else ''.join(word.title() for word in mode_words.split()) + 'Lock'
+        for name in _split_names(match.group('names')):
+            _add(result, name, mode if mode in LOCK_MODES else ACCESS_EXCLUSIVE)
+
+    return result
+
+
+def extract_relation_locks(sql_parser: Optional[str], script: str) -> Dict[str, Set[str]]:
+    """
+    Find relations written or changed by migration script and table lock modes statements take on them.
+    Relations which are only read, like sources of INSERT ... SELECT, are not included.
+    Parameters:
+        sql_parser (Optional[str]): parser name, regex search of common DDL/DML is used if None or parser fails.
+        script (str): migration script.
+    Returns:
+        locks (Dict[str, Set[str]]): lock modes in pg_locks names by relation names in the form accepted by to_regclass.
+    """
+    if sql_parser == POSTGRESQL_PARSER:
+        try:
+            return _extract_with_postgresql_parser(script)
+        except Exception:
+            pass
+
+    return _extract_with_regex(script)
@@ -0,0 +1,179 @@
+import dataclasses
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Dict, Tuple, Iterable
+
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_files.directives import parse_directives
+from migration_tool.migration_files.file import MigrationFile
+
+UP = 'up'
+DOWN = 'down'
+POSTGRESQL_PARSER = 'postgresql'
+
+DOLLAR_QUOTED_REGEX = re.compile(r'(\$[A-Za-z_]*\$).*?\1', re.DOTALL)
+LINE_COMMENT_REGEX = re.compile(r'--[^\n]*')
+TRANSACTION_CONTROL_REGEX = re.compile(
+    r'^\s*(BEGIN|COMMIT|ROLLBACK|START\s+TRANSACTION)\s*(TRANSACTION|WORK)?\s*;',
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+@dataclasses.dataclass
+class ValidationIssue:
+    version: int
+    migration_type: str
+    message: str
+
+    def __str__(self):
+        return f"{self.version} {self.migration_type}: {self.message}"
+
+
+def _check_script_with_postgresql_parser(script: str) -> List[str]:
+    from pglast import parse_sql, ast
+    from pglast.parser import ParseError
+
+    try:
+        statements = parse_sql(script)
+    except ParseError as e:
+        return [f"syntax error: {e}"]
+
+    return [
+        f"transaction control statement {statement.stmt.kind.name.removeprefix('TRANS_STMT_')} is not allowed, "
+        f"migration is run inside runner transaction"
+        for statement in statements
+        if isinstance(statement.stmt, ast.TransactionStmt)
+    ]
+
+
+def _check_script_with_regex(script: str) -> List[str]:
+    # function bodies and comments may contain BEGIN/COMMIT words, they are dropped before search
+    stripped = DOLLAR_QUOTED_REGEX.sub('', script)
+    stripped = LINE_COMMENT_REGEX.sub('', stripped)
+
+    return [
+        f"transaction control statement {match.group(1).upper()} is not allowed, "
+        f"migration is run inside runner transaction"
+        for match in TRANSACTION_CONTROL_REGEX.finditer(stripped)
+    ]
+
+
+def _check_directives(script: str, allow_directives: bool) -> List[str]:
+    try:
+        directives = parse_directives(script)
+    except ValueError as e:
+        return [f"invalid pmmt directive: {e}"]
+
+    if len(directives) > 0 and not allow_directives:
+        return [f"pmmt directives {sorted(directives)} are not supported by db type"]
+
+    return []
+
+
+def check_script(sql_parser: Optional[str], script: str, allow_directives: bool = True) -> List[str]:
+    """
+    Check single migration script, module level function for running in process pool.
+    Parameters:
+        sql_parser (Optional[str]): parser name, only transaction control check is done if None.
+        script (str): migration script.
+        allow_directives (bool): whether '-- pmmt:' session directives can be used in script.
+    Returns:
+        problems (List[str]): found problems descriptions.
+    """
+    problems = _check_directives(script, allow_directives)
+
+    if sql_parser == POSTGRESQL_PARSER:
+        return problems + _check_script_with_postgresql_parser(script)
+
+    return problems + _check_script_with_regex(script)
+
+
+class MigrationFilesValidator(LoggerMixIn):
+    """
+    Offline migration files validation, scripts are parsed across process pool
+    without any db connection.
+    """
+    # process pool start is more expensive than parsing of a few scripts
+    MIN_POOL_SCRIPTS = 32
+
+    def __init__(
+            self,
+            sql_parser: Optional[str] = None,
+            workers: Optional[int] = None,
+            allow_directives: bool = True,
+    ):
+        self._sql_parser = sql_parser
+        self._workers = workers
+        self._allow_directives = allow_directives
+
+        if self._sql_parser == POSTGRESQL_PARSER:
+            try:
+                import pglast
+            except ImportError:
+                self.logger.warning(
+                    f"Package 'pglast' is not installed, syntax check is skipped, "
+                    f"only transaction control statements are checked"
+                )
+                self._sql_parser = None
+
+    def _check_scripts(self, scripts: List[Tuple[int, str, str]]) -> List[ValidationIssue]:
+        parsers = [self._sql_parser] * len(scripts)
+        queries = [script for _, _, script in scripts]
+        allow_directives = [self._allow_directives] * len(scripts)
+
+        if len(scripts) < self.MIN_POOL_SCRIPTS or self._workers == 1:
+            results = map(check_script, parsers, queries, allow_directives)
+            return self._collect_issues(scripts, results)
+
+        with ProcessPoolExecutor(max_workers=self._workers) as pool:
+            results = pool.map(check_script, parsers, queries, allow_directives, chunksize=8)
+            return self._collect_issues(scripts, results)
+
+    @staticmethod
+    def _collect_issues(scripts: List[Tuple[int, str, str]], results: Iterable[List[str]]) -> List[ValidationIssue]:
+        return [
+            ValidationIssue(version=version, migration_type=migration_type, message=message)
+            for (version, migration_type, _), messages in zip(scripts, results)
+            for message in messages
+        ]
+
+    def validate_files(self, files: List[MigrationFile]) -> List[ValidationIssue]:
+        """
+        Validate all up and down scripts of given files.
+        """
+        scripts = []
+        for file in files:
+            scripts.append((file.version, UP, file.up_query))
+            if file.down_query is not None:
+                scripts.append((file.version, DOWN, file.down_query))
+
+        return self._check_scripts(scripts)
+
+    def validate_path(
+            self,
+            files_map: Dict[int, MigrationFile],
+            path: List[Tuple[int, str]],
+    ) -> List[ValidationIssue]:
+        """
+        Validate that every path step has a script and all these scripts are correct.
+        Parameters:
+            files_map (Dict[int, MigrationFile]): migration files by version.
+            path (List[Tuple[int, str]]): migration path steps as version and 'up'/'down'.
+        """
+        issues = []
+        scripts = []
+
+        for version, migration_type in path:
+            file = files_map.get(version)
+            if file is None:
+                issues.append(ValidationIssue(version, migration_type, "migration file not found"))
+                continue
+
+            script = file.up_query if migration_type == UP else file.down_query
+            if script is None:
+                issues.append(ValidationIssue(version, migration_type, f"{migration_type} script not found"))
+                continue
+
+            scripts.append((version, migration_type, script))
+
+        return issues + self._check_scripts(scripts)
@@ -7,6 +7,8 @@ from migration_tool.logger.mix_in import LoggerMixIn
 
 
 class MigrationMeta(LoggerMixIn, ABC):
+    _target_conn: Optional[Connection] = None
+
     @abstractmethod
     def _try_get_target_connection(self) -> Optional[Connection]:
         raise NotImplementedError()
@@ -30,6 +32,11 @@ class MigrationMeta(LoggerMixIn, ABC):
 
         return self._get_current_version()
 
+    def close(self):
+        if self._target_conn is not None:
+            self._target_conn.close()
+            self._target_conn = None
+
     @abstractmethod
     def update_migration_version(self, new_version: int, target_conn: Optional[Connection] = None):
         raise NotImplementedError()
@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Optional
+
+from retry import retry
+from sqlalchemy import Connection, Engine, inspect, text
+
+from migration_tool.migration_meta.base import MigrationMeta
+
+ROOT_PATH = Path(__file__).parent.parent.parent
+
+
+class MySQLMigrationMeta(MigrationMeta):
+    # mysql schema is server wide, so meta is stored in table of target db
+    MIGRATION_META_TABLE = 'version_meta_history'
+    META_SCRIPT = ROOT_PATH / 'raw' / 'mysql' / 'meta.sql'
+    SELECT_VERSION_SCRIPT = 'SELECT version FROM version_meta_history ORDER BY id DESC LIMIT 1'
+    UPDATE_VERSION_SCRIPT = 'INSERT INTO version_meta_history (version) VALUES ({version})'
+
+    def __init__(self, target_engine: Engine, target_conn: Optional[Connection] = None):
+        self._target_conn = target_conn
+        self._target_engine = target_engine
+
+    def _try_get_target_connection(self) -> Optional[Connection]:
+        if self._target_conn is None or self._target_conn.closed:
+            try:
+                self._target_conn = self._target_engine.connect()
+            except Exception as e:
+                self._target_conn = None
+
+        return self._target_conn
+
+    @retry(tries=3, delay=10, backoff=2)
+    def _check_meta_storage(self) -> bool:
+        if self.MIGRATION_META_TABLE in inspect(self._target_engine).get_table_names():
+            return True
+
+        self.logger.info(f"Meta storage table not found: {self.MIGRATION_META_TABLE}")
+        if self._try_get_target_connection() is None:
+            return False
+
+        with open(self.META_SCRIPT, 'r', encoding="utf-8") as file:
+            script = file.read()
+
+        self.logger.info(f"Run meta initialization script")
+        raw_conn = self._target_engine.raw_connection()
+        try:
+            with raw_conn.cursor() as cursor:
+                cursor.execute(script)
+                while cursor.nextset():
+                    pass
+            raw_conn.commit()
+        except Exception as e:
+            raw_conn.rollback()
+            self.logger.error(f"Receiver error on meta initialization: {e}")
+            raise
+        finally:
+            raw_conn.close()
+
+        self.logger.info(f"Meta initialization complete")
+        return True
+
+    def _get_current_version(self) -> int:
+        conn = self._try_get_target_connection()
+        if conn is None:
+            raise ConnectionError("Can't establish connection for target DB.")
+
+        curr_version = conn.execute(text(self.SELECT_VERSION_SCRIPT)).fetchall()
+        curr_version = list(curr_version)[0][0]
+
+        return curr_version
+
+    def get_update_version_script(self, new_version: int) -> str:
+        """
+        Script for version tracking, used for running it on the same driver connection with migration.
+        """
+        if not self._check_meta_storage():
+            raise ConnectionError("Can't initialize meta storage for target DB.")
+
+        return self.UPDATE_VERSION_SCRIPT.format(version=int(new_version))
+
+    def update_migration_version(self, new_version: int, target_conn: Optional[Connection] = None):
+        if not self._check_meta_storage():
+            self.logger.warning(f"Skipping tracking of version: {new_version} due of problems with meta_storage")
+            return
+
+        conn = target_conn
+        if conn is None:
+            conn = self._try_get_target_connection()
+        if conn is None:
+            raise ConnectionError("Can't establish connection for target DB.")
+
+        conn.execute(text(self.UPDATE_VERSION_SCRIPT.format(version=int(new_version))))
+        if target_conn is None:
+            conn.commit()
+        self.logger.info(f"Meta version updated to: {new_version}")
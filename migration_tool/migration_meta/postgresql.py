@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 from retry import retry
 from sqlalchemy import Connection, Engine, Inspector, text
@@ -14,6 +14,27 @@ class PostgreSQLMigrationMeta(MigrationMeta):
     META_SCRIPT = ROOT_PATH / 'raw' / 'postgresql' / 'meta.sql'
     SELECT_VERSION_SCRIPT = 'SELECT version FROM version_meta.current_version'
     UPDATE_VERSION_SCRIPT = ';CALL version_meta.sp_update_db_version({version});'
+    FINGERPRINT_STORAGE_SCRIPT = ROOT_PATH / 'raw' / 'postgresql' / 'fingerprint.sql'
+    SCHEMA_OBJECTS_SCRIPT = ROOT_PATH / 'raw' / 'postgresql' / 'schema_objects.sql'
+    CHECK_FINGERPRINT_STORAGE_SCRIPT = "SELECT to_regclass('version_meta.schema_fingerprint')"
+    # objects are hashed in stable order, so fingerprint does not depend on catalog scan order
+    FINGERPRINT_SCRIPT = '''
+        SELECT
+            md5(coalesce(string_agg(kind || ' ' || name || ' ' || hash, E'\\n' ORDER BY kind, name), '')) AS fingerprint,
+            coalesce(jsonb_object_agg(kind || ' ' || name, hash), '{{}}') AS objects
+        FROM ({objects}) o
+    '''
+    INSERT_FINGERPRINT_SCRIPT = '''
+        INSERT INTO version_meta.schema_fingerprint(version, fingerprint, objects)
+        SELECT :version, f.fingerprint, f.objects FROM ({fingerprint}) f
+    '''
+    SELECT_FINGERPRINT_SCRIPT = '''
+        SELECT fingerprint, objects
+        FROM version_meta.schema_fingerprint
+        WHERE version = :version
+        ORDER BY update_date DESC
+        LIMIT 1
+    '''
 
     def __init__(self, target_engine: Engine, target_conn: Optional[Connection] = None):
         self._target_conn = target_conn
@@ -83,3 +104,57 @@ class PostgreSQLMigrationMeta(MigrationMeta):
         sql_version = text(str(self.UPDATE_VERSION_SCRIPT).format(version=new_version))
         conn.execute(sql_version)
         self.logger.info(f"Meta version updated to: {new_version}")
+
+    @property
+    def schema_objects_script(self) -> str:
+        with open(self.SCHEMA_OBJECTS_SCRIPT, 'r', encoding="utf-8") as file:
+            return file.read()
+
+    @property
+    def fingerprint_script(self) -> str:
+        return self.FINGERPRINT_SCRIPT.format(objects=self.schema_objects_script)
+
+    def _check_fingerprint_storage(self, conn: Connection):
+        # storage is created lazily, meta schema of already tracked dbs has no fingerprint table
+        if conn.execute(text(self.CHECK_FINGERPRINT_STORAGE_SCRIPT)).scalar() is not None:
+            return
+
+        with open(self.FINGERPRINT_STORAGE_SCRIPT, 'r', encoding="utf-8") as file:
+            conn.execute(text(file.read()))
+
+    def record_schema_fingerprint(self, version: int, target_conn: Connection):
+        """
+        Store fingerprint of schema reached by version, runs in migration transaction.
+        """
+        self._check_fingerprint_storage(target_conn)
+        target_conn.execute(
+            text(self.INSERT_FINGERPRINT_SCRIPT.format(fingerprint=self.fingerprint_script)),
+            {'version': int(version)},
+        )
+        self.logger.info(f"Schema fingerprint recorded for version: {version}")
+
+    def read_expected_fingerprint(self, version: int) -> Optional[Dict]:
+        """
+        Returns:
+            last recorded fingerprint and object hashes for version, None if version was never fingerprinted
+        """
+        with self._target_engine.connect() as conn:
+            if conn.execute(text(self.CHECK_FINGERPRINT_STORAGE_SCRIPT)).scalar() is None:
+                return None
+
+            row = conn.execute(text(self.SELECT_FINGERPRINT_SCRIPT), {'version': int(version)}).fetchone()
+
+        if row is None:
+            return None
+
+        return {'fingerprint': row.fingerprint, 'objects': row.objects}
+
+    def read_live_fingerprint(self) -> str:
+        with self._target_engine.connect() as conn:
+            return conn.execute(text(self.fingerprint_script)).fetchone().fingerprint
+
+    def read_live_objects(self) -> Dict[str, str]:
+        with self._target_engine.connect() as conn:
+            rows = conn.execute(text(self.schema_objects_script)).fetchall()
+
+        return {f"{row.kind} {row.name}": row.hash for row in rows}
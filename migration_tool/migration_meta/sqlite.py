@@ -0,0 +1,89 @@
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import Connection, Engine, inspect, text
+
+from migration_tool.migration_meta.base import MigrationMeta
+
+ROOT_PATH = Path(__file__).parent.parent.parent
+
+
+class SQLiteMigrationMeta(MigrationMeta):
+    MIGRATION_META_TABLE = 'version_meta_history'
+    META_SCRIPT = ROOT_PATH / 'raw' / 'sqlite' / 'meta.sql'
+    SELECT_VERSION_SCRIPT = 'SELECT version FROM version_meta_history ORDER BY id DESC LIMIT 1'
+    UPDATE_VERSION_SCRIPT = 'INSERT INTO version_meta_history (version) VALUES ({version});'
+
+    def __init__(self, target_engine: Engine, db_path: str, target_conn: Optional[Connection] = None):
+        self._target_conn = target_conn
+        self._target_engine = target_engine
+        self._db_path = Path(db_path)
+
+    def _try_get_target_connection(self) -> Optional[Connection]:
+        # connecting to sqlite creates db file, so missing file is handled as missing db
+        if not self._db_path.exists():
+            return None
+
+        if self._target_conn is None or self._target_conn.closed:
+            self._target_conn = self._target_engine.connect()
+
+        return self._target_conn
+
+    def _check_meta_storage(self) -> bool:
+        if not self._db_path.exists():
+            return False
+
+        if self.MIGRATION_META_TABLE in inspect(self._target_engine).get_table_names():
+            return True
+
+        self.logger.info(f"Meta storage table not found: {self.MIGRATION_META_TABLE}")
+        with open(self.META_SCRIPT, 'r', encoding="utf-8") as file:
+            script = file.read()
+
+        self.logger.info(f"Run meta initialization script")
+        raw_conn = self._target_engine.raw_connection()
+        try:
+            raw_conn.driver_connection.executescript(script)
+        except Exception as e:
+            self.logger.error(f"Receiver error on meta initialization: {e}")
+            raise
+        finally:
+            raw_conn.close()
+
+        self.logger.info(f"Meta initialization complete")
+        return True
+
+    def _get_current_version(self) -> int:
+        conn = self._try_get_target_connection()
+        if conn is None:
+            raise ConnectionError("Can't establish connection for target DB.")
+
+        curr_version = conn.execute(text(self.SELECT_VERSION_SCRIPT)).fetchall()
+        curr_version = list(curr_version)[0][0]
+
+        return curr_version
+
+    def get_update_version_script(self, new_version: int) -> str:
+        """
+        Script for version tracking, used for running it in the same script with migration.
+        """
+        if not self._check_meta_storage():
+            raise ConnectionError("Can't initialize meta storage for target DB.")
+
+        return self.UPDATE_VERSION_SCRIPT.format(version=int(new_version))
+
+    def update_migration_version(self, new_version: int, target_conn: Optional[Connection] = None):
+        if not self._check_meta_storage():
+            self.logger.warning(f"Skipping tracking of version: {new_version} due of problems with meta_storage")
+            return
+
+        conn = target_conn
+        if conn is None:
+            conn = self._try_get_target_connection()
+        if conn is None:
+            raise ConnectionError("Can't establish connection for target DB.")
+
+        conn.execute(text(self.UPDATE_VERSION_SCRIPT.format(version=int(new_version))))
+        if target_conn is None:
+            conn.commit()
+        self.logger.info(f"Meta version updated to: {new_version}")
@@ -0,0 +1,157 @@
+import dataclasses
+import os
+import secrets
+import subprocess
+import time
+from typing import List, Optional
+
+from sqlalchemy import create_engine, text
+
+from migration_tool.db_migration.base import ExecMigration
+from migration_tool.db_migration.postgresql import PostgreSQLMigrationRunner, APP_NAME
+from migration_tool.db_types import DBType
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.timings import MigrationTiming
+
+
+class PostgreSQLRehearsal(LoggerMixIn):
+    """
+    Runs migration path on a throwaway clone of target db.
+    Clone is made by 'template' (CREATE DATABASE ... TEMPLATE, target db must have no other connections)
+    or by 'dump' (pg_dump | pg_restore, optionally into other local server).
+    """
+    METHOD_TEMPLATE = 'template'
+    METHOD_DUMP = 'dump'
+    CREATE_SCRIPT = 'CREATE DATABASE {scratch}'
+    CREATE_FROM_TEMPLATE_SCRIPT = 'CREATE DATABASE {scratch} TEMPLATE {source}'
+    DROP_SCRIPT = 'DROP DATABASE IF EXISTS {scratch}'
+
+    def __init__(
+            self,
+            config: MigrationConfig,
+            files_loader: MigrationFilesLoader,
+            method: str = METHOD_TEMPLATE,
+            scratch_host: Optional[str] = None,
+            scratch_port: Optional[str] = None,
+    ):
+        if config.db_type != DBType.Postgresql:
+            raise ValueError(f"Rehearsal is supported only for {DBType.Postgresql.value} targets")
+        if method == self.METHOD_TEMPLATE and (scratch_host is not None or scratch_port is not None):
+            raise ValueError(f"Scratch server can be used only with '{self.METHOD_DUMP}' method")
+
+        self._config = config
+        self._files_loader = files_loader
+        self._method = method
+        # set when scratch db is created by this rehearsal, so failed CREATE never drops db of other run
+        self._is_created = False
+        self.scratch_config = dataclasses.replace(
+            config,
+            db_name=f"{config.db_name}_rehearsal_{secrets.token_hex(4)}",
+            db_host=scratch_host if scratch_host is not None else config.db_host,
+            db_port=scratch_port if scratch_port is not None else config.db_port,
+            # target replicas don't have scratch db, waiting for their lag would only exhaust replica wait budget
+            replicas=[],
+            max_replica_lag=None,
+        )
+
+    @staticmethod
+    def _quote(name: str) -> str:
+        return '"' + name.replace('"', '""') + '"'
+
+    def _execute_on_scratch_server(self, script: str):
+        engine = create_engine(
+            PostgreSQLMigrationRunner.build_uri(self.scratch_config, PostgreSQLMigrationRunner.DEFAULT_DB_NAME),
+            connect_args={"application_name": APP_NAME},
+            isolation_level="AUTOCOMMIT",
+        )
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(script))
+        finally:
+            engine.dispose()
+
+    def _pg_env(self, config: MigrationConfig):
+        return {
+            **os.environ,
+            'PGHOST': str(config.db_host),
+            'PGPORT': str(config.db_port),
+            'PGUSER': str(config.db_user),
+            'PGPASSWORD': str(config.db_pass),
+            'PGDATABASE': config.db_name,
+            'PGAPPNAME': APP_NAME,
+        }
+
+    def _clone_with_dump(self):
+        self._execute_on_scratch_server(self.CREATE_SCRIPT.format(scratch=self._quote(self.scratch_config.db_name)))
+        self._is_created = True
+
+        dump = subprocess.Popen(
+            ['pg_dump', '--format=custom', '--no-owner', '--no-privileges'],
+            env=self._pg_env(self._config),
+            stdout=subprocess.PIPE,
+        )
+        restore = subprocess.run(
+            ['pg_restore', '--no-owner', '--no-privileges', '--exit-on-error', f"--dbname={self.scratch_config.db_name}"],
+            env=self._pg_env(self.scratch_config),
+            stdin=dump.stdout,
+        )
+        dump.stdout.close()
+
+        if dump.wait() != 0 or restore.returncode != 0:
+            raise RuntimeError(f"Can't clone {self._config.db_name} with pg_dump/pg_restore")
+
+    def clone(self):
+        self.logger.info(f"Cloning {self._config.db_name} into {self.scratch_config.db_name} by {self._method}")
+        start = time.perf_counter()
+
+        if self._method == self.METHOD_TEMPLATE:
+            self._execute_on_scratch_server(self.CREATE_FROM_TEMPLATE_SCRIPT.format(
+                scratch=self._quote(self.scratch_config.db_name),
+                source=self._quote(self._config.db_name),
+            ))
+            self._is_created = True
+        elif self._method == self.METHOD_DUMP:
+            self._clone_with_dump()
+        else:
+            raise ValueError(f"Unknown clone method: {self._method}")
+
+        self.logger.info(f"Clone done in {time.perf_counter() - start:.1f}s")
+
+    def drop(self):
+        self.logger.info(f"Dropping scratch db {self.scratch_config.db_name}")
+        self._execute_on_scratch_server(self.DROP_SCRIPT.format(scratch=self._quote(self.scratch_config.db_name)))
+
+    def run(
+            self,
+            from_version: Optional[int] = None,
+            to_version: int = 0,
+            is_keep: bool = False,
+    ) -> List[MigrationTiming]:
+        runner = None
+        try:
+            # scratch db may be partially restored by failed clone, it is dropped if CREATE succeeded
+            self.clone()
+            runner = PostgreSQLMigrationRunner(
+                config=self.scratch_config,
+                files_loader=self._files_loader,
+            )
+            migration_path: List[ExecMigration] = runner.build_migration_path(
+                from_version=from_version,
+                to_version=to_version,
+            )
+            # db level scripts contain real db names, running them on clone would touch the target
+            db_level = [step for step in migration_path if step[0] in runner.DB_LEVEL_MIGRATIONS]
+            if len(db_level) > 0:
+                raise ValueError(f"DB level migrations {db_level} can't be rehearsed")
+
+            runner.validate_migration_path(migration_path)
+            runner.sync(migration_path)
+        finally:
+            if runner is not None:
+                runner.dispose()
+            if not is_keep and self._is_created:
+                self.drop()
+
+        return runner.migration_timings
@@ -1,7 +1,13 @@
 import os
+from functools import lru_cache
+from typing import Optional
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# values of MIGRATION_BLOCKER_POLICY, see PostgreSQLMigrationRunner._wait_for_quiet_window
+BLOCKER_POLICIES = ('wait', 'terminate_idle')
+
 
 class Settings(BaseSettings):
     """App settings from env file."""
@@ -10,6 +16,27 @@ class Settings(BaseSettings):
         extra='allow',
     )
     CONFIG_PATH: str
+    MIGRATION_LOCK_TIMEOUT: int = 600
+    MIGRATION_CACHE_DIR: Optional[str] = '.pmmt_cache'
+    MIGRATION_TIMINGS_PATH: Optional[str] = None
+    MIGRATION_BLOCKER_WAIT_BUDGET: int = 300
+    MIGRATION_BLOCKER_POLICY: str = 'wait'
+    MIGRATION_IDLE_TERMINATE_AFTER: int = 30
+    MIGRATION_DDL_LOCK_TIMEOUT: str = '5s'
+    MIGRATION_SCHEMA_FINGERPRINT: bool = True
+    MIGRATION_REPLICA_WAIT_BUDGET: int = 600
+
+    @field_validator('MIGRATION_BLOCKER_POLICY')
+    @classmethod
+    def check_blocker_policy(cls, value: str) -> str:
+        if value not in BLOCKER_POLICIES:
+            raise ValueError(f"unknown blocker policy '{value}', allowed: {list(BLOCKER_POLICIES)}")
+        return value
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    """
+    App settings, env file is read on the first call.
+    """
+    return Settings()
@@ -0,0 +1,152 @@
+import dataclasses
+import queue
+import threading
+import time
+from typing import List, Optional, Dict, Set
+
+from migration_tool.config_parser.parser import MigrationsConfigParser
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.logger.utils import bind_log_context
+
+
+@dataclasses.dataclass
+class SurveyResult:
+    name: str
+    source: str
+    version: Optional[int] = None
+    latest_version: Optional[int] = None
+    status: str = 'unknown'
+    error: Optional[str] = None
+    duration: Optional[float] = None
+
+
+class FleetSurvey(LoggerMixIn):
+    """
+    Concurrent current version survey of many targets, each target is read through
+    one lightweight probe connection and compared with latest version of its source.
+    """
+    STATUS_OK = 'ok'
+    STATUS_BEHIND = 'behind'
+    STATUS_AHEAD = 'ahead'
+    STATUS_MISSING = 'missing'
+    STATUS_ERROR = 'error'
+    STATUS_TIMEOUT = 'timeout'
+
+    def __init__(self, parser: MigrationsConfigParser, timeout: float = 5, workers: int = 64):
+        self._parser = parser
+        self._timeout = timeout
+        self._workers = workers
+
+    def _read_latest_version(self, source_id: str) -> Optional[int]:
+        return self._parser.sources[source_id].get_loader().get_latest_version()
+
+    def _read_latest_versions(self, source_ids: Set[str]) -> Dict[str, Optional[int]]:
+        latest_versions = {}
+        for source_id in source_ids:
+            try:
+                latest_versions[source_id] = self._read_latest_version(source_id)
+            except Exception as e:
+                self.logger.error(f"Can't read latest version of source {source_id}: {e}")
+                latest_versions[source_id] = None
+
+        return latest_versions
+
+    def _read_version(self, name: str, source: str) -> SurveyResult:
+        start = time.monotonic()
+        with bind_log_context(target=name):
+            try:
+                version = self._parser.targets[name].get_probe(timeout=self._timeout).read_version()
+                result = SurveyResult(name=name, source=source, version=version)
+            except Exception as e:
+                self.logger.warning(f"Can't read version: {e}")
+                result = SurveyResult(name=name, source=source, status=self.STATUS_ERROR, error=repr(e))
+
+        result.duration = round(time.monotonic() - start, 3)
+        return result
+
+    def _resolve_status(self, result: SurveyResult) -> str:
+        if result.status != 'unknown':
+            return result.status
+        if result.version is None:
+            return self.STATUS_MISSING
+        if result.latest_version is None or result.version == result.latest_version:
+            return self.STATUS_OK
+        if result.version < result.latest_version:
+            return self.STATUS_BEHIND
+
+        return self.STATUS_AHEAD
+
+    def _collect_versions(self, names: List[str], sources: List[str]) -> List[SurveyResult]:
+        """
+        Read versions with daemon worker threads, so stuck probes are never joined.
+        Probes have own timeouts, the bound here is only for stuck drivers and is measured from probe start.
+        Worker of a stuck probe is replaced, so targets queued behind it are still read.
+        """
+        bound = self._timeout * 2 + 1
+        tasks: queue.SimpleQueue = queue.SimpleQueue()
+        for i in range(len(names)):
+            tasks.put(i)
+
+        results: List[Optional[SurveyResult]] = [None] * len(names)
+        started: Dict[int, float] = {}
+        condition = threading.Condition()
+
+        def work():
+            while True:
+                try:
+                    i = tasks.get_nowait()
+                except queue.Empty:
+                    return
+
+                with condition:
+                    started[i] = time.monotonic()
+                    condition.notify()
+
+                result = self._read_version(names[i], sources[i])
+                with condition:
+                    # result of a probe already marked as timed out is dropped
+                    if results[i] is None:
+                        results[i] = result
+                    condition.notify()
+
+        def start_worker():
+            threading.Thread(target=work, name='survey', daemon=True).start()
+
+        for _ in range(min(self._workers, len(names))):
+            start_worker()
+
+        latest_versions = self._read_latest_versions(set(sources))
+
+        with condition:
+            while any(result is None for result in results):
+                now = time.monotonic()
+                running = {i: start for i, start in started.items() if results[i] is None}
+
+                for i, start in running.items():
+                    if now - start >= bound:
+                        self.logger.warning(f"Probe of target {names[i]} is stuck for {now - start:.1f}s")
+                        results[i] = SurveyResult(
+                            name=names[i],
+                            source=sources[i],
+                            status=self.STATUS_TIMEOUT,
+                            duration=round(now - start, 3),
+                        )
+                        start_worker()
+
+                deadlines = [start + bound for i, start in running.items() if results[i] is None]
+                if any(result is None for result in results):
+                    condition.wait(timeout=min(deadlines) - now if len(deadlines) > 0 else None)
+
+        return [
+            dataclasses.replace(result, latest_version=latest_versions[result.source])
+            for result in results
+        ]
+
+    def run(self, names: List[str]) -> List[SurveyResult]:
+        sources = [self._parser.targets[name].source for name in names]
+        results = self._collect_versions(names, sources)
+
+        return [
+            dataclasses.replace(result, status=self._resolve_status(result))
+            for result in results
+        ]
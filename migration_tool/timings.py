@@ -0,0 +1,112 @@
+import dataclasses
+import json
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from migration_tool.logger.mix_in import LoggerMixIn
+
+
+@dataclasses.dataclass
+class MigrationTiming:
+    version: int
+    direction: str
+    name: str
+    duration: float
+    # relation:lock mode pairs held by migration transaction before commit
+    locks: List[str] = dataclasses.field(default_factory=list)
+    # session settings applied by '-- pmmt:' directives
+    directives: Dict[str, str] = dataclasses.field(default_factory=dict)
+
+
+class TimingStore(LoggerMixIn):
+    """
+    Local sqlite store of migration durations, used for ETA of next runs.
+    """
+    CREATE_SCRIPT = '''
+        CREATE TABLE IF NOT EXISTS migration_timings(
+            target TEXT NOT NULL,
+            version INT NOT NULL,
+            direction TEXT NOT NULL,
+            name TEXT NOT NULL,
+            duration REAL NOT NULL,
+            locks TEXT NOT NULL,
+            is_rehearsal INT NOT NULL,
+            recorded_at REAL NOT NULL,
+            directives TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS migration_timings_key ON migration_timings(target, version, direction);
+    '''
+    INSERT_SCRIPT = 'INSERT INTO migration_timings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+    COLUMNS_SCRIPT = 'PRAGMA table_info(migration_timings)'
+    ADD_DIRECTIVES_SCRIPT = "ALTER TABLE migration_timings ADD COLUMN directives TEXT NOT NULL DEFAULT '{}'"
+    SELECT_SCRIPT = 'SELECT duration FROM migration_timings WHERE target = ? AND version = ? AND direction = ?'
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=10)
+        conn.executescript(self.CREATE_SCRIPT)
+        # stores written before directives tracking
+        if 'directives' not in {row[1] for row in conn.execute(self.COLUMNS_SCRIPT)}:
+            conn.execute(self.ADD_DIRECTIVES_SCRIPT)
+
+        return conn
+
+    def record(self, target: str, timings: List[MigrationTiming], is_rehearsal: bool = False):
+        if len(timings) == 0:
+            return
+
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(self.INSERT_SCRIPT, [
+                    (
+                        target,
+                        timing.version,
+                        timing.direction,
+                        timing.name,
+                        timing.duration,
+                        json.dumps(timing.locks),
+                        int(is_rehearsal),
+                        now,
+                        json.dumps(timing.directives),
+                    )
+                    for timing in timings
+                ])
+        finally:
+            conn.close()
+
+        self.logger.info(f"Recorded timings of {len(timings)} migrations for target {target}")
+
+    def estimate(self, target: str, steps: List[Tuple[int, str]]) -> Tuple[float, int]:
+        """
+        Estimate path duration by median of recorded durations.
+        Parameters:
+            target (str): target id.
+            steps (List[Tuple[int, str]]): path steps as version and 'up'/'down'.
+        Returns:
+            duration (float): estimated seconds for steps with history.
+            known (int): count of steps with history.
+        """
+        duration = 0.0
+        known = 0
+
+        conn = self._connect()
+        try:
+            for version, direction in steps:
+                rows = conn.execute(self.SELECT_SCRIPT, (target, version, direction)).fetchall()
+                if len(rows) == 0:
+                    continue
+
+                duration += statistics.median(row[0] for row in rows)
+                known += 1
+        finally:
+            conn.close()
+
+        return duration, known
@@ -0,0 +1,19 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from migration_tool.logger.mix_in import LoggerMixIn
+
+
+class VersionProbe(LoggerMixIn, ABC):
+    """
+    Lightweight current version reader, uses a single raw driver connection
+    without engines, meta storage checks or migration files loading.
+    """
+    @abstractmethod
+    def read_version(self) -> Optional[int]:
+        """
+        Read current db version.
+        Returns:
+            version (Optional[int]): current version or None if db has no meta storage.
+        """
+        raise NotImplementedError()
@@ -0,0 +1,46 @@
+from typing import Optional
+
+import pymysql
+from pymysql.constants import ER
+
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.version_probe.base import VersionProbe
+
+APP_NAME = 'migration-tool'
+
+
+class MySQLVersionProbe(VersionProbe):
+    SELECT_VERSION_SCRIPT = 'SELECT version FROM version_meta_history ORDER BY id DESC LIMIT 1'
+    DEFAULT_TIMEOUT = 5
+
+    def __init__(self, config: MigrationConfig, timeout: Optional[float] = None):
+        self._config = config
+        self._timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT
+
+    def _connect(self):
+        return pymysql.connect(
+            database=self._config.db_name,
+            user=self._config.db_user,
+            password=self._config.db_pass,
+            host=self._config.db_host,
+            port=int(self._config.db_port),
+            program_name=APP_NAME,
+            connect_timeout=max(1, int(self._timeout)),
+            read_timeout=self._timeout,
+        )
+
+    def read_version(self) -> Optional[int]:
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(self.SELECT_VERSION_SCRIPT)
+                row = cursor.fetchone()
+        except pymysql.err.ProgrammingError as e:
+            if e.args[0] != ER.NO_SUCH_TABLE:
+                raise
+            self.logger.info(f"Meta storage not found in db: {self._config.db_name}")
+            return None
+        finally:
+            conn.close()
+
+        return row[0] if row is not None else None
@@ -0,0 +1,54 @@
+from typing import Optional
+
+import psycopg2
+from psycopg2 import errors
+
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.version_probe.base import VersionProbe
+
+APP_NAME = 'migration-tool'
+
+
+class PostgreSQLVersionProbe(VersionProbe):
+    SELECT_VERSION_SCRIPT = 'SELECT version FROM version_meta.current_version'
+    DEFAULT_TIMEOUT = 5
+
+    def __init__(self, config: MigrationConfig, timeout: Optional[float] = None):
+        self._config = config
+        self._timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT
+
+    def _connect_to(self, config: MigrationConfig):
+        return psycopg2.connect(
+            dbname=config.db_name,
+            user=config.db_user,
+            password=config.db_pass,
+            host=config.db_host,
+            port=config.db_port,
+            application_name=APP_NAME,
+            connect_timeout=max(1, int(self._timeout)),
+            options=f"-c statement_timeout={int(self._timeout * 1000)}",
+        )
+
+    def _connect(self):
+        # version reads go to replicas first, primary is used only if none of them is reachable
+        for replica_config in self._config.get_replica_configs():
+            try:
+                return self._connect_to(replica_config)
+            except psycopg2.OperationalError as e:
+                self.logger.warning(f"Replica {replica_config.db_host}:{replica_config.db_port} is not reachable: {e}")
+
+        return self._connect_to(self._config)
+
+    def read_version(self) -> Optional[int]:
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(self.SELECT_VERSION_SCRIPT)
+                row = cursor.fetchone()
+        except errors.UndefinedTable:
+            self.logger.info(f"Meta storage not found in db: {self._config.db_name}")
+            return None
+        finally:
+            conn.close()
+
+        return row[0] if row is not None else None
@@ -0,0 +1,33 @@
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.version_probe.base import VersionProbe
+
+
+class SQLiteVersionProbe(VersionProbe):
+    SELECT_VERSION_SCRIPT = 'SELECT version FROM version_meta_history ORDER BY id DESC LIMIT 1'
+    DEFAULT_TIMEOUT = 5
+
+    def __init__(self, config: MigrationConfig, timeout: Optional[float] = None):
+        self._config = config
+        self._timeout = timeout if timeout is not None else self.DEFAULT_TIMEOUT
+
+    def read_version(self) -> Optional[int]:
+        db_path = Path(self._config.db_name)
+        if not db_path.exists():
+            self.logger.info(f"DB file not found: {db_path}")
+            return None
+
+        # read only mode, so probe never creates or locks db for writing
+        conn = sqlite3.connect(f"{db_path.absolute().as_uri()}?mode=ro", uri=True, timeout=self._timeout)
+        try:
+            row = conn.execute(self.SELECT_VERSION_SCRIPT).fetchone()
+        except sqlite3.OperationalError as e:
+            self.logger.info(f"Meta storage not found in db: {db_path}: {e}")
+            return None
+        finally:
+            conn.close()
+
+        return row[0] if row is not None else None
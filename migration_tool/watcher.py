@@ -0,0 +1,76 @@
+import time
+from typing import Dict, List, Optional
+
+from migration_tool.config_parser.parser import MigrationsConfigParser
+from migration_tool.db_types import DBType
+from migration_tool.dialects import get_dialect
+from migration_tool.logger.mix_in import LoggerMixIn
+from migration_tool.migration_files.file import MigrationFile
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+
+
+class SourcesWatcher(LoggerMixIn):
+    """
+    Polls revisions of all configured migration sources and pre-loads migration files
+    into local cache when a source revision moves.
+    """
+
+    def __init__(self, parser: MigrationsConfigParser, is_plan: bool = False):
+        self._parser = parser
+        self._is_plan = is_plan
+        self._loaders: Dict[str, MigrationFilesLoader] = {
+            source_id: source.get_loader()
+            for source_id, source in parser.sources.items()
+        }
+        self._etags: Dict[str, Optional[str]] = {}
+        self._revisions: Dict[str, str] = {}
+
+    def _plan_targets(self, source_id: str, files: List[MigrationFile]):
+        if len(files) == 0:
+            return
+        last_version = max(file.version for file in files)
+
+        for target in self._parser.targets.values():
+            if target.source != source_id:
+                continue
+
+            try:
+                # plan is read only: version is read by probe, path is built without runner and its engines
+                curr_version = target.get_probe().read_version()
+                runner_class = get_dialect(DBType(target.type)).get_runner_class()
+                path = runner_class.plan_migration_path(curr_version, to_version=last_version)
+                self.logger.info(f"Plan for target {target.id} to version {last_version}: {path}")
+            except Exception as e:
+                self.logger.error(f"Can't build plan for target {target.id}: {e}")
+
+    def poll(self):
+        for source_id, loader in list(self._loaders.items()):
+            try:
+                revision, etag = loader.poll_revision(self._etags.get(source_id))
+            except NotImplementedError:
+                self.logger.warning(f"Source {source_id} does not support revision polling, skipping it")
+                self._loaders.pop(source_id)
+                continue
+            except Exception as e:
+                self.logger.error(f"Can't poll revision for source {source_id}: {e}")
+                continue
+
+            self._etags[source_id] = etag
+            if revision is None or self._revisions.get(source_id) == revision:
+                continue
+
+            self.logger.info(f"Source {source_id} moved to revision: {revision}")
+            try:
+                files = loader.load_revision_files(revision)
+                if self._is_plan:
+                    self._plan_targets(source_id, files)
+            except Exception as e:
+                self.logger.error(f"Can't pre-load migration files for source {source_id}: {e}")
+                continue
+
+            self._revisions[source_id] = revision
+
+    def run(self, interval: float):
+        while True:
+            self.poll()
+            time.sleep(interval)
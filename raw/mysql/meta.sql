@@ -0,0 +1,8 @@
+
+CREATE TABLE IF NOT EXISTS version_meta_history(
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    version INT NOT NULL,
+    update_date TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP(6)
+);
+
+INSERT INTO version_meta_history (version) VALUES (0);
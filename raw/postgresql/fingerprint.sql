@@ -0,0 +1,8 @@
+CREATE TABLE IF NOT EXISTS version_meta.schema_fingerprint(
+    version INT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    objects JSONB NOT NULL,
+    update_date TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS schema_fingerprint_version ON version_meta.schema_fingerprint(version, update_date);
@@ -0,0 +1,60 @@
+WITH schemas AS (
+    SELECT oid, nspname
+    FROM pg_namespace
+    WHERE nspname NOT IN ('information_schema', 'version_meta')
+        AND nspname NOT LIKE 'pg\_%'
+), extension_objects AS (
+    SELECT classid, objid
+    FROM pg_depend
+    WHERE deptype = 'e'
+)
+SELECT
+    'table' AS kind,
+    n.nspname || '.' || c.relname AS name,
+    md5(c.relkind || ':' || coalesce(string_agg(
+        a.attname || ' ' || format_type(a.atttypid, a.atttypmod)
+            || CASE WHEN a.attnotnull THEN ' not null' ELSE '' END
+            || coalesce(' default ' || pg_get_expr(d.adbin, d.adrelid), ''),
+        ', ' ORDER BY a.attname
+    ), '')) AS hash
+FROM pg_class c
+JOIN schemas n ON n.oid = c.relnamespace
+LEFT JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+LEFT JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+WHERE c.relkind IN ('r', 'p', 'f', 'v', 'm')
+    AND (CAST('pg_class' AS regclass), c.oid) NOT IN (SELECT classid, objid FROM extension_objects)
+GROUP BY n.nspname, c.relname, c.relkind
+UNION ALL
+SELECT
+    'view',
+    n.nspname || '.' || c.relname,
+    md5(pg_get_viewdef(c.oid))
+FROM pg_class c
+JOIN schemas n ON n.oid = c.relnamespace
+WHERE c.relkind IN ('v', 'm')
+    AND (CAST('pg_class' AS regclass), c.oid) NOT IN (SELECT classid, objid FROM extension_objects)
+UNION ALL
+SELECT
+    'index',
+    n.nspname || '.' || c.relname,
+    md5(pg_get_indexdef(i.indexrelid))
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+JOIN schemas n ON n.oid = c.relnamespace
+UNION ALL
+SELECT
+    'constraint',
+    n.nspname || '.' || c.relname || '.' || co.conname,
+    md5(co.contype || ':' || pg_get_constraintdef(co.oid))
+FROM pg_constraint co
+JOIN pg_class c ON c.oid = co.conrelid
+JOIN schemas n ON n.oid = c.relnamespace
+UNION ALL
+SELECT
+    'function',
+    n.nspname || '.' || p.proname || '(' || pg_get_function_identity_arguments(p.oid) || ')',
+    md5(pg_get_functiondef(p.oid))
+FROM pg_proc p
+JOIN schemas n ON n.oid = p.pronamespace
+WHERE p.prokind IN ('f', 'p')
+    AND (CAST('pg_proc' AS regclass), p.oid) NOT IN (SELECT classid, objid FROM extension_objects)
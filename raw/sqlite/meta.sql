@@ -0,0 +1,8 @@
+
+CREATE TABLE IF NOT EXISTS version_meta_history(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    version INT NOT NULL,
+    update_date TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO version_meta_history (version) VALUES (0);
@@ -0,0 +1,52 @@
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).parent.parent
+# heavy packages which are needed only by migration runners and loaders
+FORBIDDEN_MODULES = ['sqlalchemy', 'github', 'pandas', 'psycopg2', 'pymysql', 'pglast', 'retry']
+# cumulative import time of status command in microseconds, mostly pydantic-settings
+STATUS_IMPORT_BUDGET = 500_000
+IMPORT_TIME_REGEX = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| (\S+)$')
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT_PATH,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_status_command_does_not_import_runners():
+    script = (
+        'import json, sys\n'
+        'import migration_tool.cli, migration_tool.commands.status\n'
+        'print(json.dumps(sorted({name.split(".")[0] for name in sys.modules})))\n'
+    )
+    loaded = set(json.loads(run_python('-c', script).stdout))
+
+    assert loaded & set(FORBIDDEN_MODULES) == set()
+
+
+def test_status_command_import_time_budget():
+    result = run_python('-X', 'importtime', '-c', 'import migration_tool.cli, migration_tool.commands.status')
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_REGEX.match(line)
+        if match is not None:
+            cumulative[match.group(2)] = int(match.group(1))
+
+    total = cumulative['migration_tool.cli'] + cumulative['migration_tool.commands.status']
+    assert total < STATUS_IMPORT_BUDGET
+
+
+def test_cli_help_is_served_without_settings():
+    result = run_python('-m', 'migration_tool.cli', 'status', '--help')
+
+    assert 'usage:' in result.stdout
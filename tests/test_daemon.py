@@ -0,0 +1,89 @@
+import http.client
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+from migration_tool.daemon import state
+from migration_tool.daemon.server import MigrationDaemonHTTPServer, MigrationDaemonUnixServer
+from migration_tool.db_migration.sqlite import SQLiteMigrationRunner
+from tests.test_sqlite_runner import FILES, MemoryMigrationFilesLoader, config  # noqa: F401
+
+
+def test_tasks_do_not_leave_meta_connection_open(config, monkeypatch):
+    monkeypatch.setattr(state, 'read_config', lambda: None)
+    monkeypatch.setattr(state, 'get_target', lambda name, parser: None)
+    monkeypatch.setattr(
+        state,
+        'get_runner_for_db',
+        lambda name, parser: SQLiteMigrationRunner(config, MemoryMigrationFilesLoader(FILES)),
+    )
+    daemon_state = state.MigrationDaemonState()
+    try:
+        assert daemon_state.apply('lite', to_version=2) == 2
+        assert daemon_state.plan('lite', to_version=1) == [[2, 'down']]
+
+        runner = daemon_state._runners['lite']
+        assert runner.migration_meta._target_conn is None
+    finally:
+        daemon_state.shutdown()
+
+
+class StatusState:
+    @staticmethod
+    def status(name):
+        return 2
+
+
+@pytest.fixture
+def http_server():
+    server = MigrationDaemonHTTPServer(StatusState(), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def post_status(server, headers):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+    try:
+        conn.request('POST', '/status', body=json.dumps({'name': 'lite'}), headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_json_request_is_served(http_server):
+    assert post_status(http_server, {'Content-Type': 'application/json'}) == (200, {'name': 'lite', 'version': 2})
+
+
+def test_simple_cross_origin_request_is_rejected(http_server):
+    status, _ = post_status(http_server, {'Content-Type': 'text/plain'})
+
+    assert status == 415
+
+
+def test_foreign_host_is_rejected(http_server):
+    status, _ = post_status(http_server, {'Content-Type': 'application/json', 'Host': 'evil.example:80'})
+
+    assert status == 403
+
+
+def test_unix_socket_is_private_and_not_taken_over(tmp_path):
+    socket_path = str(tmp_path / 'daemon.sock')
+    server = MigrationDaemonUnixServer(StatusState(), socket_path)
+    try:
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+        with pytest.raises(RuntimeError):
+            MigrationDaemonUnixServer(StatusState(), socket_path)
+    finally:
+        server.server_close()
+
+    # socket file left by stopped daemon is replaced
+    MigrationDaemonUnixServer(StatusState(), socket_path).server_close()
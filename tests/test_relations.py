@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from migration_tool.migration_files.relations import extract_relation_locks
+from migration_tool.migration_files.validation import POSTGRESQL_PARSER
+
+
+@pytest.mark.parametrize('sql_parser', [POSTGRESQL_PARSER, None])
+def test_read_relations_are_not_included(sql_parser):
+    locks = extract_relation_locks(sql_parser, 'INSERT INTO a SELECT x FROM public.b JOIN "C" ON true')
+
+    assert {name.strip('"') for name in locks} == {'a'}
+    assert list(locks.values()) == [{'RowExclusiveLock'}]
+
+
+def test_regex_finds_indexes_and_qualified_names():
+    locks = extract_relation_locks(
+        None,
+        'ALTER INDEX public.i RENAME TO j;\n'
+        'DROP INDEX CONCURRENTLY IF EXISTS s.k, "S"."L";\n'
+        'DROP TABLE a, public.b;\n'
+        'LOCK TABLE c IN SHARE MODE;\n',
+    )
+
+    assert locks == {
+        'public.i': {'AccessExclusiveLock'},
+        's.k': {'ShareUpdateExclusiveLock'},
+        '"S"."L"': {'ShareUpdateExclusiveLock'},
+        'a': {'AccessExclusiveLock'},
+        'public.b': {'AccessExclusiveLock'},
+        'c': {'ShareLock'},
+    }
+
+
+def test_parser_finds_foreign_key_target():
+    locks = extract_relation_locks(
+        POSTGRESQL_PARSER,
+        'ALTER TABLE public.a ADD CONSTRAINT f FOREIGN KEY (x) REFERENCES public.b (id)',
+    )
+
+    assert locks == {'"public"."a"': {'AccessExclusiveLock'}, '"public"."b"': {'ShareRowExclusiveLock'}}
+
+
+def test_only_conflicting_holders_block():
+    from migration_tool.db_migration.postgresql import PostgreSQLMigrationRunner
+
+    readers = [
+        SimpleNamespace(pid=1, relation='a', mode='AccessShareLock'),
+        SimpleNamespace(pid=2, relation='a', mode='RowExclusiveLock'),
+    ]
+
+    assert PostgreSQLMigrationRunner._conflicting_blockers(readers, {'a': {'RowExclusiveLock'}}) == []
+    assert PostgreSQLMigrationRunner._conflicting_blockers(readers, {'a': {'ShareLock'}}) == readers[1:]
+    assert PostgreSQLMigrationRunner._conflicting_blockers(readers, {'a': {'AccessExclusiveLock'}}) == readers
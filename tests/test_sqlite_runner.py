@@ -0,0 +1,180 @@
+import dataclasses
+import json
+import sqlite3
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from migration_tool.db_migration.sqlite import SQLiteMigrationRunner
+from migration_tool.db_types import DBType
+from migration_tool.migration_config import MigrationConfig
+from migration_tool.migration_files.file import MigrationFile
+from migration_tool.migration_files.loader.base import MigrationFilesLoader
+from migration_tool.version_probe.sqlite import SQLiteVersionProbe
+
+ROOT_PATH = Path(__file__).parent.parent
+FILES = [
+    MigrationFile(version=0, name='init', up_query='PRAGMA journal_mode=WAL;', down_query=''),
+    MigrationFile(version=1, name='users', up_query='CREATE TABLE users(id INT);', down_query='DROP TABLE users;'),
+    MigrationFile(
+        version=2,
+        name='orders',
+        up_query='CREATE TABLE orders(id INT); INSERT INTO orders VALUES (1);',
+        down_query='DROP TABLE orders;',
+    ),
+]
+
+
+class MemoryMigrationFilesLoader(MigrationFilesLoader):
+    def __init__(self, files: List[MigrationFile]):
+        self._files = files
+
+    def load_files_list(self) -> List[MigrationFile]:
+        return list(self._files)
+
+
+@pytest.fixture
+def config(tmp_path) -> MigrationConfig:
+    return MigrationConfig(
+        db_name=str(tmp_path / 'target.db'),
+        db_type=DBType.Sqlite,
+        db_user=None,
+        db_pass=None,
+        db_port=None,
+        db_host=None,
+        target_id='lite',
+    )
+
+
+def migrate(config: MigrationConfig, to_version: int):
+    runner = SQLiteMigrationRunner(config, MemoryMigrationFilesLoader(FILES))
+    try:
+        runner.migrate(to_version=to_version)
+    finally:
+        runner.dispose()
+
+
+def read_tables(config: MigrationConfig) -> List[str]:
+    conn = sqlite3.connect(config.db_name)
+    try:
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name").fetchall()
+    finally:
+        conn.close()
+
+    return [row[0] for row in rows]
+
+
+def test_probe_reports_missing_db(config):
+    assert SQLiteVersionProbe(config).read_version() is None
+
+
+def test_migrate_up_down_up(config):
+    migrate(config, to_version=2)
+    assert SQLiteVersionProbe(config).read_version() == 2
+    assert read_tables(config) == ['orders', 'users', 'version_meta_history']
+
+    migrate(config, to_version=1)
+    assert SQLiteVersionProbe(config).read_version() == 1
+    assert read_tables(config) == ['users', 'version_meta_history']
+
+    migrate(config, to_version=2)
+    assert SQLiteVersionProbe(config).read_version() == 2
+    assert read_tables(config) == ['orders', 'users', 'version_meta_history']
+
+
+def test_failed_migration_is_rolled_back(config):
+    migrate(config, to_version=1)
+
+    broken = FILES[:2] + [
+        MigrationFile(version=2, name='broken', up_query='CREATE TABLE t(id INT); SELECT * FROM missing;', down_query=''),
+    ]
+    runner = SQLiteMigrationRunner(config, MemoryMigrationFilesLoader(broken))
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            runner.migrate(to_version=2)
+    finally:
+        runner.dispose()
+
+    assert SQLiteVersionProbe(config).read_version() == 1
+    assert read_tables(config) == ['users', 'version_meta_history']
+
+
+def test_reused_runner_records_only_last_migrate(config):
+    recorded = []
+    runner = SQLiteMigrationRunner(config, MemoryMigrationFilesLoader(FILES))
+    runner.timing_store = SimpleNamespace(
+        estimate=lambda *args, **kwargs: (0, 0),
+        record=lambda target, timings: recorded.append([timing.version for timing in timings]),
+    )
+    try:
+        runner.migrate(to_version=2)
+        runner.migrate(to_version=1)
+    finally:
+        runner.dispose()
+
+    assert recorded == [[0, 1, 2], [2]]
+
+
+class WaitingSQLiteMigrationRunner(SQLiteMigrationRunner):
+    """
+    Runner which always waits for migration lock held by another process.
+    """
+
+    @property
+    def capabilities(self):
+        return dataclasses.replace(super().capabilities, advisory_locks=True)
+
+    @contextmanager
+    def _migration_lock(self):
+        yield True
+
+
+def test_waited_run_from_version_is_not_skipped(config):
+    migrate(config, to_version=2)
+
+    runner = WaitingSQLiteMigrationRunner(config, MemoryMigrationFilesLoader(FILES))
+    try:
+        runner.migrate(to_version=2)
+        assert runner.migration_timings == []
+
+        runner.migrate(from_version=1, to_version=2)
+        assert [(timing.version, timing.direction) for timing in runner.migration_timings] == [(2, 'down'), (2, 'up')]
+    finally:
+        runner.dispose()
+
+    assert SQLiteVersionProbe(config).read_version() == 2
+
+
+def test_status_command(config, tmp_path):
+    migrate(config, to_version=2)
+
+    config_path = tmp_path / 'config.yaml'
+    config_path.write_text(
+        'sources:\n'
+        '  - id: bundle\n'
+        '    type: bundle\n'
+        f"    path: {tmp_path / 'migrations.pmmb'}\n"
+        'db:\n'
+        '  - id: lite\n'
+        '    type: sqlite\n'
+        f'    name: {config.db_name}\n'
+        '    source: bundle\n'
+    )
+    env_path = tmp_path / 'env'
+    env_path.write_text(f"CONFIG_PATH={config_path}\nMIGRATION_CACHE_DIR={tmp_path / 'cache'}\n")
+
+    result = subprocess.run(
+        [sys.executable, '-m', 'migration_tool.cli', 'status', '--name', 'lite'],
+        cwd=ROOT_PATH,
+        env={'ENV_FILE': str(env_path), 'PATH': str(Path(sys.executable).parent)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert json.loads(result.stdout) == {'name': 'lite', 'version': 2}
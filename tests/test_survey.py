@@ -0,0 +1,64 @@
+import time
+from types import SimpleNamespace
+from typing import Dict
+
+from migration_tool.survey import FleetSurvey
+
+
+class SleepingProbe:
+    def __init__(self, version: int, delay: float):
+        self._version = version
+        self._delay = delay
+
+    def read_version(self):
+        time.sleep(self._delay)
+        return self._version
+
+
+def make_parser(delays: Dict[str, float], latest_version: int = 2):
+    targets = {
+        name: SimpleNamespace(
+            source='source',
+            get_probe=lambda timeout, delay=delay: SleepingProbe(version=1, delay=delay),
+        )
+        for name, delay in delays.items()
+    }
+    loader = SimpleNamespace(get_latest_version=lambda: latest_version)
+    sources = {'source': SimpleNamespace(get_loader=lambda: loader)}
+
+    return SimpleNamespace(targets=targets, sources=sources)
+
+
+def test_stuck_probe_is_not_waited():
+    parser = make_parser({'stuck': 6, 'fast': 0})
+    survey = FleetSurvey(parser, timeout=0.5, workers=4)
+
+    start = time.monotonic()
+    results = {result.name: result for result in survey.run(['stuck', 'fast'])}
+
+    assert time.monotonic() - start < 4
+    assert results['stuck'].status == FleetSurvey.STATUS_TIMEOUT
+    assert results['stuck'].version is None
+    assert results['fast'].status == FleetSurvey.STATUS_BEHIND
+    assert results['fast'].latest_version == 2
+
+
+def test_queued_targets_are_not_timed_out():
+    # targets wait in queue longer than the bound, but each probe itself is fast
+    delays = {f"target_{i}": 0.3 for i in range(8)}
+    survey = FleetSurvey(make_parser(delays), timeout=0.1, workers=1)
+
+    results = survey.run(list(delays))
+
+    assert [result.status for result in results] == [FleetSurvey.STATUS_BEHIND] * 8
+
+
+def test_stuck_worker_is_replaced():
+    delays = {'stuck': 6, **{f"target_{i}": 0 for i in range(3)}}
+    survey = FleetSurvey(make_parser(delays), timeout=0.5, workers=1)
+
+    start = time.monotonic()
+    results = survey.run(list(delays))
+
+    assert time.monotonic() - start < 4
+    assert [result.status for result in results] == [FleetSurvey.STATUS_TIMEOUT] + [FleetSurvey.STATUS_BEHIND] * 3
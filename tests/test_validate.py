@@ -0,0 +1,46 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from migration_tool.migration_files.file import MigrationFile
+from migration_tool.migration_files.loader.directory import (
+    FromDirectoryMigrationFilesLoader,
+    FromDirectoryMigrationFilesLoaderConfig,
+)
+
+ROOT_PATH = Path(__file__).parent.parent
+
+
+def write_scripts(files_dir: Path):
+    (files_dir / '0001_users.up.sql').write_text('BEGIN;\nCREATE TABLE users(id INT);\nCOMMIT;\n')
+    (files_dir / '0001_users.down.sql').write_text('DROP TABLE users;')
+    (files_dir / '0002_orders.up.sql').write_text('CREAT TABLE orders(id INT);')
+    (files_dir / 'README.md').write_text('not a migration')
+
+
+def test_directory_loader_reads_scripts(tmp_path):
+    write_scripts(tmp_path)
+
+    files = FromDirectoryMigrationFilesLoader(FromDirectoryMigrationFilesLoaderConfig(str(tmp_path))).load_files_list()
+
+    assert files == [
+        MigrationFile(version=1, name='users', up_query='\nCREATE TABLE users(id INT);\n', down_query='DROP TABLE users;'),
+        MigrationFile(version=2, name='orders', up_query='CREAT TABLE orders(id INT);', down_query=None),
+    ]
+
+
+def test_validate_directory_without_config(tmp_path):
+    files_dir = tmp_path / 'migrations'
+    files_dir.mkdir()
+    write_scripts(files_dir)
+
+    result = subprocess.run(
+        [sys.executable, '-m', 'migration_tool.cli', 'validate', '--dir', str(files_dir)],
+        cwd=tmp_path,
+        env={'PYTHONPATH': str(ROOT_PATH), 'PATH': str(Path(sys.executable).parent)},
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 1
+    assert '2 up: syntax error' in result.stdout